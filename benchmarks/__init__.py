@@ -0,0 +1,9 @@
+"""
+Benchmarks for the engine's hot paths.
+
+    python -m benchmarks run [-o results.json] [-k filter]
+    python -m benchmarks compare results.json [--baseline FILE] [--threshold 0.1]
+    python -m benchmarks run --save-baseline
+
+Everything runs headless on SDL's dummy drivers.
+"""
@@ -0,0 +1,52 @@
+import argparse
+import os
+import sys
+
+from benchmarks import runner
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), 'results')
+BASELINE = os.path.join(RESULTS_DIR, 'baseline.json')
+
+
+def main():
+    parser = argparse.ArgumentParser(prog='python -m benchmarks', description='Engine hot path benchmarks.')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run = commands.add_parser('run', help='run the benchmarks and write their results')
+    run.add_argument('-o', '--output', default=os.path.join(RESULTS_DIR, 'latest.json'))
+    run.add_argument('-k', '--filter', help='only run benchmarks whose name contains this')
+    run.add_argument('--save-baseline', action='store_true', help='also store the results as the baseline')
+
+    compare = commands.add_parser('compare', help='flag regressions against the baseline')
+    compare.add_argument('results', nargs='?', default=os.path.join(RESULTS_DIR, 'latest.json'))
+    compare.add_argument('--baseline', default=BASELINE)
+    compare.add_argument('--threshold', type=float, default=0.1, help='allowed slowdown, 0.1 = 10%%')
+    compare.add_argument('--metric', default='median_ms', choices=('median_ms', 'p95_ms', 'mean_ms', 'min_ms'))
+    args = parser.parse_args()
+
+    if args.command == 'run':
+        # the benchmarks load game data with paths relative to the repo root
+        os.chdir(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        from benchmarks import engine  # registers the benchmarks
+        results = runner.run_benchmarks(args.filter)
+        for path in [args.output] + ([BASELINE] if args.save_baseline else []):
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            runner.save(path, results)
+            print(f'-> {path}')
+        return 0
+
+    rows, regressions = runner.compare(runner.load(args.baseline), runner.load(args.results), args.threshold, args.metric)
+    print(f'{"benchmark":<28} {"baseline":>10} {"current":>10} {"change":>8}')
+    for name, base, current, change in rows:
+        base_text = f'{base:10.3f}' if base is not None else f'{"-":>10}'
+        change_text = f'{change:+8.1%}' if change is not None else f'{"new":>8}'
+        flag = '  REGRESSION' if name in regressions else ''
+        print(f'{name:<28} {base_text} {current:10.3f} {change_text}{flag}')
+    if regressions:
+        print(f'{len(regressions)} regression(s) over {args.threshold:.0%} on {args.metric}')
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,145 @@
+"""
+The engine benchmarks. Each setup builds its own state on the headless game.
+"""
+import numpy as np
+import pygame
+
+from benchmarks.runner import benchmark
+from scripts.headless import init_headless, make_gameplay
+from scripts.inputs import ScriptedInput, InputFrame
+from scripts.bullets import SpritePool
+from scripts.player import Bullet
+
+MAP = 'data/maps/0.tmx'
+BULLET_COUNTS = (100, 1000, 10000)
+
+
+def idle(tick, state):
+    return InputFrame()
+
+
+def gameplay(seed=1):
+    init_headless()
+    return make_gameplay(ScriptedInput(idle), seed)
+
+
+def fill_bullets(manager, center, count, radius=100, seed=1):
+    """
+    count bullets scattered around center with a few ticks of trail each.
+    """
+    rng = np.random.default_rng(seed)
+    angles = rng.uniform(0, 360, count)
+    manager.spawn_many(center, angles)
+    manager.pos[:count] += rng.uniform(-radius, radius, (count, 2))
+    for _ in range(manager.max_trail_length):
+        manager.trail[:count, manager.trail_head] = manager.pos[:count]
+        manager.trail_head = (manager.trail_head + 1) % manager.max_trail_length
+    manager.trail_length[:count] = manager.max_trail_length
+
+
+def snapshot(manager):
+    """
+    A reset function that restores the manager's bullets as they are now.
+    """
+    arrays = ('pos', 'vel', 'lifetime', 'damage', 'phase', 'trail', 'trail_length')
+    saved = {name: getattr(manager, name).copy() for name in arrays}
+    count, head = manager.count, manager.trail_head
+
+    def reset():
+        for name in arrays:
+            getattr(manager, name)[:] = saved[name]
+        manager.count, manager.trail_head = count, head
+    return reset
+
+
+@benchmark('tilemap_construction', repeats=20)
+def tilemap_construction():
+    from scripts import mapbundle
+    from scripts.tilemap import TileMap
+    init_headless()
+
+    def reset():
+        # read the compiled bundle from disk, not the in-process copy
+        mapbundle._loaded.clear()
+    return lambda: TileMap(MAP), reset
+
+
+def bullet_update(count):
+    def setup():
+        state = gameplay()
+        bullets = state.boss.bullets
+        fill_bullets(bullets, state.player.rect.center, count)
+        return lambda: bullets.update(1 / 120), snapshot(bullets)
+    return setup
+
+
+def bullet_draw(count):
+    def setup():
+        state = gameplay()
+        bullets = state.boss.bullets
+        fill_bullets(bullets, state.player.rect.center, count)
+        surface = pygame.display.get_surface()
+        return lambda: bullets.draw(surface, state.camera), None
+    return setup
+
+
+for count in BULLET_COUNTS:
+    benchmark(f'bullets_update_{count}')(bullet_update(count))
+    benchmark(f'bullets_draw_{count}', repeats=50 if count >= 10000 else 200)(bullet_draw(count))
+
+
+@benchmark('check_collisions')
+def check_collisions():
+    state = gameplay()
+    # a busy scene: boss bullets around the player, player bullets around the boss
+    fill_bullets(state.boss.bullets, state.player.rect.center, 500)
+    state.player.invincible = True
+    direction = pygame.Vector2(1, 0)
+    # killed bullets go back to a pool of their own, never to the game's bullet_pool
+    pool = SpritePool(Bullet)
+    for offset in range(40):
+        position = (state.boss.rect.centerx - 80 + (offset % 20) * 8, state.boss.rect.centery + (offset // 20) * 40)
+        pool.acquire(position, direction, [state.player.bullets])
+    reset_bullets = snapshot(state.boss.bullets)
+    player_bullets = state.player.bullets.sprites()
+    health = state.boss.health
+
+    def reset():
+        reset_bullets()
+        state.player.bullets.add(player_bullets)
+        pool.free.clear()  # they are alive again
+        state.boss.health = health
+    return state.check_collisions, reset
+
+
+@benchmark('player_move')
+def player_move():
+    state = gameplay()
+    player = state.player
+    player.direction = pygame.Vector2(1, 1).normalize()
+    start = player.hitbox_rect.copy()
+
+    def reset():
+        player.hitbox_rect = start.copy()
+    return lambda: player.move(1 / 120), reset
+
+
+@benchmark('camera_update_apply')
+def camera_update_apply():
+    state = gameplay()
+    camera = state.camera
+    rects = [sprite.rect for sprite in state.all_sprites]
+
+    def run():
+        camera.update(state.player.rect, 1 / 120)
+        for rect in rects:
+            camera.apply(rect)
+    return run, None
+
+
+@benchmark('gameplay_draw', repeats=100)
+def gameplay_draw():
+    state = gameplay()
+    fill_bullets(state.boss.bullets, state.player.rect.center, 300)
+    surface = pygame.display.get_surface()
+    return lambda: state.draw(surface), None
@@ -0,0 +1,118 @@
+import json
+import platform
+import time
+import tracemalloc
+
+import numpy as np
+
+# name -> setup function, filled by the @benchmark decorator
+BENCHMARKS = {}
+
+
+def benchmark(name, repeats=200):
+    """
+    Register a benchmark. The decorated setup function builds the state and
+    returns (run, reset): run is the timed call, reset (or None) puts the state
+    back before every call so each repeat measures the same work.
+    """
+    def register(setup):
+        BENCHMARKS[name] = (setup, repeats)
+        return setup
+    return register
+
+
+def measure(setup, repeats):
+    run, reset = setup()
+
+    # warm up caches and lazily built images before timing
+    for _ in range(min(5, repeats)):
+        if reset:
+            reset()
+        run()
+
+    times = []
+    for _ in range(repeats):
+        if reset:
+            reset()
+        start = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - start)
+
+    # allocations in a separate pass, tracing would skew the timings
+    allocation_repeats = min(20, repeats)
+    peaks = []
+    blocks = 0
+    tracemalloc.start()
+    for _ in range(allocation_repeats):
+        if reset:
+            reset()
+        before_size, _ = tracemalloc.get_traced_memory()
+        before_blocks = len(tracemalloc.take_snapshot().traces)
+        tracemalloc.reset_peak()
+        run()
+        _, peak = tracemalloc.get_traced_memory()
+        peaks.append(peak - before_size)
+        blocks += len(tracemalloc.take_snapshot().traces) - before_blocks
+    tracemalloc.stop()
+
+    times_ms = np.array(times) * 1000
+    return {
+        'repeats': repeats,
+        'median_ms': float(np.median(times_ms)),
+        'p95_ms': float(np.percentile(times_ms, 95)),
+        'mean_ms': float(times_ms.mean()),
+        'min_ms': float(times_ms.min()),
+        'alloc_peak_kb': float(np.median(peaks)) / 1024,  # transient memory per call
+        'alloc_blocks': blocks / allocation_repeats,  # blocks still alive per call
+    }
+
+
+def run_benchmarks(name_filter=None, log=print):
+    import pygame
+
+    results = {}
+    for name, (setup, repeats) in BENCHMARKS.items():
+        if name_filter and name_filter not in name:
+            continue
+        results[name] = measure(setup, repeats)
+        result = results[name]
+        log(f'{name:<28} median {result["median_ms"]:8.3f} ms  p95 {result["p95_ms"]:8.3f} ms  '
+            f'peak {result["alloc_peak_kb"]:8.1f} KiB')
+    return {
+        'meta': {
+            'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'pygame': pygame.version.ver,
+            'numpy': np.__version__,
+            'machine': platform.platform(),
+        },
+        'results': results,
+    }
+
+
+def save(path, data):
+    with open(path, 'w') as file:
+        json.dump(data, file, indent=2)
+
+
+def load(path):
+    with open(path) as file:
+        return json.load(file)
+
+
+def compare(baseline, current, threshold=0.1, metric='median_ms'):
+    """
+    Rows of (name, baseline, current, change) and the names slower than baseline by more than threshold.
+    """
+    rows = []
+    regressions = []
+    for name, result in current['results'].items():
+        base = baseline['results'].get(name)
+        if base is None:
+            rows.append((name, None, result[metric], None))
+            continue
+        change = result[metric] / base[metric] - 1 if base[metric] else 0
+        rows.append((name, base[metric], result[metric], change))
+        if change > threshold:
+            regressions.append(name)
+    return rows, regressions
@@ -4,6 +4,52 @@ import math, os, sys
 
 # scripts dir
 from scripts.settings import *
+from scripts.audio import audio
+from scripts.simclock import sim_clock
+from scripts.profiler import frame_profiler
+from scripts.spikes import spike_capture
+from scripts.memory import memory
+from scripts.preload import preloader
+from scripts.startup import startup_trace
+
+
+class StateRegistry:
+    """
+    State name -> factory. A state is built the first time it is looked up,
+    or ahead of need, one per frame, once queued with prewarm().
+    """
+    def __init__(self, factories):
+        self.factories = dict(factories)
+        self.states = {}
+        self.pending = []
+
+    def __contains__(self, name):
+        return name in self.factories
+
+    def __getitem__(self, name):
+        state = self.states.get(name)
+        if state is None:
+            with startup_trace.span(f'build {name}'):
+                state = self.states[name] = self.factories[name]()
+        return state
+
+    def built(self, name):
+        return name in self.states
+
+    def prewarm(self, names=None):
+        # every state when names is None
+        self.pending = [name for name in (self.factories if names is None else names) if name not in self.states]
+
+    def prewarm_step(self):
+        """
+        Build the next queued state, called once per frame after it is presented.
+        """
+        while self.pending:
+            name = self.pending.pop(0)
+            if name not in self.states:
+                self[name]
+                return name
+        return None
 
 
 class Game:
@@ -19,9 +65,25 @@ class Game:
         # setup fps
         font_path = 'data/homespun.ttf'
         self.font = pygame.font.Font(font_path, 16)
+        self.overlay_font = pygame.font.Font(font_path, 10)
+
+        # debug controls for the world clock
+        self.debug_keys = {
+            pygame.K_F5: sim_clock.toggle_pause,
+            pygame.K_F6: sim_clock.step_once,
+            pygame.K_F7: lambda: sim_clock.set_time_scale(sim_clock.time_scale / 2),
+            pygame.K_F8: lambda: sim_clock.set_time_scale(sim_clock.time_scale * 2),
+            pygame.K_F9: lambda: sim_clock.set_time_scale(1),
+            pygame.K_F3: frame_profiler.toggle_overlay,
+            pygame.K_F4: spike_capture.force,
+            pygame.K_F10: memory.report,
+        }
 
     def event_loop(self):
         for event in pygame.event.get():
+            if event.type == pygame.KEYDOWN and event.key in self.debug_keys:
+                self.debug_keys[event.key]()
+                continue
             self.state.get_event(event)
             if event.type == pygame.QUIT:
                 self.done = True
@@ -29,6 +91,8 @@ class Game:
                 sys.exit()
 
     def flip_state(self):
+        # every state starts on a fresh world clock
+        sim_clock.reset()
         current_state = self.state_name
         next_state = self.state.next_state
         self.state.done = False
@@ -36,17 +100,20 @@ class Game:
         persistent = self.state.persist
         self.state = self.states[self.state_name]
         self.state.startup(persistent)
+        memory.transition(f'{current_state} -> {next_state}')
     
     def reset_state(self):
         # Get the current state's persist data
         persistent = self.state.persist
         # Mark that we want to restart the current state
         persistent['restart'] = True
+        sim_clock.reset()
         # Reinitialize the current state
         self.state = self.states[self.state_name]
         self.state.startup(persistent)
+        memory.transition(f'restart {self.state_name}')
 
-    def update(self, dt):
+    def change_state(self):
         if self.state.quit:
             self.done = True
             pygame.quit()
@@ -58,11 +125,26 @@ class Game:
                 self.state.persist['restart'] = False
             else:
                 self.flip_state()
+
+    def update(self, dt):
+        self.change_state()
+        sim_clock.advance(dt)
         self.state.update(dt)
 
-    def draw(self):
+    def draw(self, interpolation=1.0):
+        self.state.interpolation = interpolation
         self.state.draw(self.screen)
 
+        # World clock readout while it is not running normally
+        if sim_clock.debug_paused or sim_clock.time_scale != 1:
+            label = 'PAUSED  F6 step' if sim_clock.debug_paused else f'x{sim_clock.time_scale:g}'
+            clock_text = self.font.render(label, False, (255, 255, 255))
+            self.screen.blit(clock_text, clock_text.get_rect(bottomright=(WIDTH - 10, HEIGHT - 5)))
+
+        # Frame profiler overlay
+        if frame_profiler.show_overlay:
+            frame_profiler.draw_overlay(self.screen, self.overlay_font)
+
         # FPS Counter in top right corner
         # fps = self.clock.get_fps()
         # fps_text = self.font.render(f"FPS: {math.floor(fps)}", False, (255, 255, 255))
@@ -70,14 +152,35 @@ class Game:
         # self.screen.blit(fps_text, fps_rect)
 
     def run(self):
+        # fixed step simulation paced by the world clock, the display runs at whatever rate it can
         while not self.done:
-            # delta time for fps independence
-            dt = self.clock.tick(FPS) / 1000
+            frame_profiler.begin_frame()
+            with frame_profiler.phase('idle'):
+                frame_time = self.clock.tick(FPS) / 1000
+            spike_capture.begin_frame()
 
             # event loop
-            self.event_loop()
-            self.update(dt)
-            self.draw()
+            with frame_profiler.phase('events'):
+                self.event_loop()
+            steps = sim_clock.frame(frame_time)
+            frame_profiler.count('steps', steps)
+            with frame_profiler.phase('update'):
+                # finish a slice of background loaded assets and, once the first frame is out, build one queued state
+                preloader.finalize()
+                if startup_trace.first_frame is not None:
+                    self.states.prewarm_step()
+                if not steps:
+                    # states can still finish while the world is frozen
+                    self.change_state()
+                for _ in range(steps):
+                    self.update(sim_clock.step)
+                audio.flush()
+            with frame_profiler.phase('draw'):
+                self.draw(sim_clock.alpha)
             
             # update
-            pygame.display.update()
\ No newline at end of file
+            with frame_profiler.phase('display'):
+                pygame.display.update()
+            startup_trace.frame_presented()
+            frame_profiler.end_frame()
+            spike_capture.end_frame()
\ No newline at end of file
@@ -1,30 +1,91 @@
-import pygame, sys
-from scripts.settings import *
-# states
-from scripts.states.menu import Menu
-from scripts.states.gameplay import Gameplay
-from scripts.states.game_over import GameOver
-from scripts.states.splash import Splash
-from scripts.states.backstory import Backstory
-from scripts.states.tutorial import Tutorial
-
-from game import Game
-
-pygame.init()
-pygame.display.set_caption('Knight With A Gun')
-screen = pygame.display.set_mode((WIDTH, HEIGHT), pygame.FULLSCREEN|pygame.SCALED)
-
-states = {
-    'SPLASH': Splash(),
-    'BACKSTORY': Backstory(),
-    'MENU': Menu(),
-    'TUTORIAL': Tutorial(),
-    'GAMEPLAY': Gameplay(),
-    'GAME_OVER': GameOver(),
-}
-
-game = Game(screen, states, "SPLASH")
+from scripts.startup import startup_trace
+
+with startup_trace.span('import pygame'):
+    import pygame, sys, argparse, atexit
+with startup_trace.span('import game'):
+    from scripts.settings import *
+    from game import Game, StateRegistry
+    from scripts.inputs import DeviceInput
+    from scripts.replay import InputRecorder, seed_arg
+    from scripts.spikes import spike_capture
+    from scripts.memory import memory
+    from scripts.preload import preloader
+
+STATE_NAMES = ('SPLASH', 'BACKSTORY', 'MENU', 'TUTORIAL', 'GAMEPLAY', 'GAME_OVER')
+
+parser = argparse.ArgumentParser()
+parser.add_argument('--seed', type=seed_arg, help='seed every fight with this')
+parser.add_argument('--record', help='record each fight\'s input to this file (replay with scripts.headless)')
+parser.add_argument('--profile-spikes', nargs='?', type=float, const=1000 / FPS, metavar='BUDGET_MS',
+                    help='profile every frame and save the ones slower than the budget to profiles/')
+parser.add_argument('--memory', action='store_true', help='trace Python allocations and diff them at every state change')
+parser.add_argument('--prewarm', nargs='*', choices=STATE_NAMES, metavar='STATE',
+                    help='build these states (all when none are given) one per frame after the first frame, instead of on first use')
+parser.add_argument('--startup-trace', action='store_true', help='print the startup trace and time to first frame')
+args = parser.parse_args()
+
+with startup_trace.span('pygame.init'):
+    pygame.init()
+with startup_trace.span('display'):
+    pygame.display.set_caption('Knight With A Gun')
+    screen = pygame.display.set_mode((WIDTH, HEIGHT), pygame.FULLSCREEN|pygame.SCALED)
+
+# decode gameplay assets while the intro plays
+with startup_trace.span('start preloader'):
+    preloader.start()
+
+
+# states are imported and built the first time the game switches to them
+def splash():
+    from scripts.states.splash import Splash
+    return Splash()
+
+def backstory():
+    from scripts.states.backstory import Backstory
+    return Backstory()
+
+def menu():
+    from scripts.states.menu import Menu
+    return Menu()
+
+def tutorial():
+    from scripts.states.tutorial import Tutorial
+    return Tutorial()
+
+def gameplay():
+    from scripts.states.gameplay import Gameplay
+    state = Gameplay()
+    state.seed = args.seed
+    if args.record:
+        state.controls = InputRecorder(DeviceInput(), args.record)
+    return state
+
+def game_over():
+    from scripts.states.game_over import GameOver
+    return GameOver()
+
+states = StateRegistry({
+    'SPLASH': splash,
+    'BACKSTORY': backstory,
+    'MENU': menu,
+    'TUTORIAL': tutorial,
+    'GAMEPLAY': gameplay,
+    'GAME_OVER': game_over,
+})
+
+if args.memory:
+    memory.start()
+if args.profile_spikes is not None:
+    spike_capture.arm(args.profile_spikes)
+# captures still waiting for their context frames are written on the way out
+atexit.register(spike_capture.flush)
+if args.prewarm is not None:
+    states.prewarm(args.prewarm or None)
+startup_trace.report_on_first_frame = args.startup_trace
+
+with startup_trace.span('game'):
+    game = Game(screen, states, "SPLASH")
 game.run()
 
 pygame.quit()
-sys.exit()
\ No newline at end of file
+sys.exit()
@@ -1,42 +1,37 @@
 from pathlib import Path
 import pygame
 from os.path import join
+from scripts.assets import assets
 
 class AssetLoader:
-    def __init__(self):
+    """
+    Loads through the process-wide asset registry, so every loader shares one
+    decoded copy of each image. With an owner, everything loaded stays pinned
+    in the registry while the owner is alive.
+    """
+    def __init__(self, owner=None):
         # find the root folder based from this dir
         self.base_path = Path(__file__).parent.parent
-        self.cache = {}
+        self.owner = owner
 
-    def load_image(self, *path_parts):
+    def load_image(self, *path_parts, variant=None):
         """
         Load 1 image. Path parts bisa banyak (folder-folder).
         """
-        full_path = self.base_path.joinpath(*path_parts)
-        if full_path not in self.cache:
-            self.cache[full_path] = pygame.image.load(str(full_path)).convert_alpha()
-        return self.cache[full_path]
+        return assets.image(self.base_path.joinpath(*path_parts), variant=variant, owner=self.owner)
     
-    def load_animation(self, *path_parts):
+    def load_animation(self, *path_parts, variant=None):
         """
         Load images from 1 folder (for animation).
         """
-        frames = []
-        folder_path = self.base_path.joinpath(*path_parts)
-        for img_file in sorted(folder_path.glob("*.png")):
-            frames.append(self.load_image(*folder_path.parts[len(self.base_path.parts):], img_file.name))
-        return frames
+        return assets.animation(self.base_path.joinpath(*path_parts), variant=variant, owner=self.owner)
     
 
-cursor_img = None  # cache global biar load sekali saja
-
 def custom_cursor(screen):
-    global cursor_img
     pygame.mouse.set_visible(False)
 
-    if cursor_img is None:
-        cursor_img = pygame.image.load('data/images/crosshair.png').convert_alpha()
-        cursor_img.set_alpha(150)
+    # registry keeps the faded crosshair loaded once
+    cursor_img = assets.image('data/images/crosshair.png', variant='faded')
 
     cursor_rect = cursor_img.get_frect(center=pygame.mouse.get_pos())
-    screen.blit(cursor_img, cursor_rect)
\ No newline at end of file
+    screen.blit(cursor_img, cursor_rect)
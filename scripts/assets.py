@@ -0,0 +1,252 @@
+"""
+Process-wide image registry.
+
+Every image the game loads goes through `assets`, so a file is decoded and
+converted once per process no matter how many loaders, sprites or restarts ask
+for it. Entries are keyed on (normalised path, conversion mode, variant):
+
+- mode 'alpha' is convert_alpha(), 'opaque' is convert(), 'raw' is as decoded
+- a variant is a named transform of the base image (see VARIANTS), cached
+  alongside it, e.g. the flipped run cycle
+
+Images packed by scripts.atlas are served as subsurfaces of their atlas page.
+The page is an entry like any other, except that it is never evicted while
+entries for its frames are loaded; frames weigh nothing since they share the
+page's pixels, dropping the last of them lets the page go.
+
+Decoded bytes are held to a budget; past it the least recently used entries
+are dropped. Entries pinned by an owner (a sprite's animation set) are never
+evicted while the owner is alive.
+"""
+import os
+import weakref
+from collections import OrderedDict
+from pathlib import Path
+
+import pygame
+
+from scripts.atlas import load_index
+from scripts.memory import memory, surface_bytes
+from scripts.settings import ASSET_BUDGET
+
+ROOT = Path(__file__).parent.parent
+
+MODES = ('alpha', 'opaque', 'raw')
+
+
+def faded(image, alpha=150):
+    image = image.copy()
+    image.set_alpha(alpha)
+    return image
+
+
+# derived images, name -> function of the base image returning a new surface
+VARIANTS = {
+    'flip_x': lambda image: pygame.transform.flip(image, True, False),
+    'faded': faded,
+}
+
+
+def normalise(path):
+    """
+    Absolute, case-normalised path string, relative paths are from the project root.
+    """
+    path = Path(path)
+    if not path.is_absolute():
+        path = ROOT / path
+    return os.path.normcase(os.path.normpath(path))
+
+
+class AssetRegistry:
+    def __init__(self, budget=ASSET_BUDGET):
+        self.budget = budget  # bytes
+        self.entries = OrderedDict()  # key -> surface, least recently used first
+        self.sizes = {}  # key -> bytes
+        self.pins = {}  # key -> number of live owners pinning it
+        self.folders = {}  # normalised folder -> sorted frame paths
+        self.parents = {}  # atlas frame key -> its page key
+        self.frame_refs = {}  # page key -> frame entries loaded from it
+        self.bytes = 0
+
+        # packed atlases, read on first use. use_atlas False always loads the files
+        self.use_atlas = True
+        self.atlas = None
+        self.atlas_loaded = False
+
+        # counters
+        self.hits = 0
+        self.misses = 0
+        self.decodes = 0
+        self.evictions = 0
+
+    def image(self, path, mode='alpha', variant=None, owner=None):
+        """
+        The shared surface for path. Callers must not draw on it, copy it first.
+        With an owner the entry stays loaded until the owner is garbage collected.
+        """
+        key = (normalise(path), mode, variant)
+        if owner is not None:
+            self.pin(owner, [key])  # before adding, so it is never evicted on its way in
+        image = self.entries.get(key)
+        if image is not None:
+            self.hits += 1
+            self.entries.move_to_end(key)
+        else:
+            self.misses += 1
+            if variant is None:
+                image, parent = self.decode(key[0], mode)
+                if parent is not None:
+                    self.parents[key] = parent
+                origin = 'asset_image'
+            else:
+                image = VARIANTS[variant](self.image(path, mode))
+                origin = 'asset_variant'
+            self.add(key, memory.track_surface(image, origin))
+        return image
+
+    def animation(self, folder, mode='alpha', variant=None, owner=None):
+        """
+        Every .png in folder in name order.
+        """
+        folder = normalise(folder)
+        paths = self.folders.get(folder)
+        if paths is None:
+            paths = self.folders[folder] = [str(path) for path in sorted(Path(folder).glob('*.png'))]
+        return [self.image(path, mode, variant, owner) for path in paths]
+
+    def decode(self, path, mode):
+        """
+        (image, key of the atlas page it is cut from or None)
+        """
+        if mode not in MODES:
+            raise ValueError(f'unknown mode {mode!r}, expected one of {MODES}')
+        region = self.atlas_region(path)
+        if region is not None:
+            page, rect = region
+            page_key = (normalise(page), mode, None)
+            # referenced before loading so the page cannot be evicted on its way in
+            self.frame_refs[page_key] = self.frame_refs.get(page_key, 0) + 1
+            try:
+                return self.image(page, mode).subsurface(rect), page_key
+            except Exception:
+                self.release_frame(page_key)
+                raise
+        self.decodes += 1
+        return self.convert(pygame.image.load(path), mode), None
+
+    def convert(self, image, mode):
+        # needs the display, main thread only
+        if mode == 'alpha':
+            return image.convert_alpha()
+        if mode == 'opaque':
+            return image.convert()
+        return image
+
+    def insert(self, path, image, mode='alpha'):
+        """
+        Add an image decoded elsewhere (the preloader's worker) as the entry for path.
+        """
+        key = (normalise(path), mode, None)
+        if key in self.entries:
+            return self.entries[key]  # loaded on demand in the meantime
+        self.decodes += 1
+        image = self.convert(image, mode)
+        self.add(key, memory.track_surface(image, 'asset_image'))
+        return image
+
+    def atlas_pages(self):
+        # page paths of the packed atlases, empty when there are none
+        self.atlas_region(None)
+        return list(self.atlas.pages) if self.atlas is not None else []
+
+    def atlas_region(self, path):
+        if not self.use_atlas:
+            return None
+        if not self.atlas_loaded:
+            self.atlas = load_index()
+            self.atlas_loaded = True
+        if self.atlas is None or path is None:
+            return None
+        return self.atlas.lookup(path)
+
+    def add(self, key, image):
+        size = surface_bytes(image)
+        self.entries[key] = image
+        self.sizes[key] = size
+        self.bytes += size
+        self.evict()
+
+    def evict(self):
+        # oldest unpinned entries first, pinned ones may keep the total over budget.
+        # dropping frames can free their page, which sits earlier in the order, so go round again
+        evicted = True
+        while evicted and self.bytes > self.budget:
+            evicted = False
+            for key in list(self.entries):
+                if self.bytes <= self.budget:
+                    break
+                if key in self.pins or key in self.frame_refs:
+                    continue
+                self.remove(key)
+                self.evictions += 1
+                evicted = True
+
+    def remove(self, key):
+        del self.entries[key]
+        self.bytes -= self.sizes.pop(key)
+        page_key = self.parents.pop(key, None)
+        if page_key is not None:
+            self.release_frame(page_key)
+
+    def release_frame(self, page_key):
+        count = self.frame_refs.get(page_key, 0) - 1
+        if count > 0:
+            self.frame_refs[page_key] = count
+        else:
+            self.frame_refs.pop(page_key, None)
+
+    def pin(self, owner, keys):
+        for key in keys:
+            self.pins[key] = self.pins.get(key, 0) + 1
+        weakref.finalize(owner, self.unpin, keys)
+
+    def unpin(self, keys):
+        for key in keys:
+            count = self.pins.get(key, 0) - 1
+            if count > 0:
+                self.pins[key] = count
+            else:
+                self.pins.pop(key, None)
+        self.evict()
+
+    def set_budget(self, budget):
+        self.budget = budget
+        self.evict()
+
+    def clear(self):
+        # pinned entries are in use and stay, as do the pages they are cut from
+        for key in list(self.entries):
+            if key not in self.pins and key not in self.frame_refs:
+                self.remove(key)
+        for key in list(self.entries):
+            if key not in self.pins and key not in self.frame_refs:
+                self.remove(key)  # pages whose frames were all dropped above
+        self.folders.clear()
+        self.atlas_loaded = False
+
+    def stats(self):
+        return {
+            'entries': len(self.entries),
+            'pinned': len(self.pins),
+            'bytes': self.bytes,
+            'budget': self.budget,
+            'hits': self.hits,
+            'misses': self.misses,
+            'decodes': self.decodes,
+            'evictions': self.evictions,
+            'atlas_frames': len(self.atlas) if self.atlas is not None else 0,
+        }
+
+
+assets = AssetRegistry()
+memory.track_cache('assets', assets.entries)
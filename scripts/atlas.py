@@ -0,0 +1,159 @@
+"""
+Sprite atlases.
+
+The animation frames, guns and crosshair are dozens of tiny PNGs. The packer
+bin-packs all of them into one or a few atlas pages next to the images, with
+a JSON index of where each frame landed. At runtime the asset registry serves
+an indexed image as a subsurface of its page, so a page is decoded once for
+all of its frames. A frame whose source file changed since packing (size or
+mtime) is not served from the atlas and loads from its file as before.
+
+Pack the atlases with:
+    python -m scripts.atlas
+"""
+import json
+import os
+import sys
+from pathlib import Path
+
+ATLAS_VERSION = 1
+IMAGES_DIR = Path(__file__).parent.parent / 'data' / 'images'
+CACHE_DIR_NAME = '.cache'
+INDEX_NAME = 'atlas.json'
+
+# images packed, globs relative to IMAGES_DIR
+SOURCES = ('entities/**/*.png', 'guns/*.png', 'crosshair.png')
+PAGE_SIZE = 1024
+PADDING = 1  # transparent gap between frames
+
+
+def index_path(images_dir=IMAGES_DIR):
+    return Path(images_dir) / CACHE_DIR_NAME / INDEX_NAME
+
+
+def source_files(images_dir=IMAGES_DIR):
+    images_dir = Path(images_dir)
+    files = []
+    for pattern in SOURCES:
+        for path in sorted(images_dir.glob(pattern)):
+            if CACHE_DIR_NAME not in path.relative_to(images_dir).parts and path not in files:
+                files.append(path)
+    return files
+
+
+def pack(sizes, page_size=PAGE_SIZE, padding=PADDING):
+    """
+    Shelf packing, tallest first. sizes is a list of (width, height), returns
+    (page, x, y) for each in the same order and the used (width, height) of every page.
+    """
+    order = sorted(range(len(sizes)), key=lambda index: (-sizes[index][1], -sizes[index][0], index))
+    places = [None] * len(sizes)
+    pages = []  # [used width, used height]
+    x = y = shelf_height = 0
+    for index in order:
+        width, height = sizes[index]
+        if width > page_size or height > page_size:
+            raise ValueError(f'{width}x{height} image does not fit a {page_size} page')
+        if pages and x + width > page_size:
+            # next shelf
+            x, y = 0, y + shelf_height
+            shelf_height = 0
+        if not pages or y + height > page_size:
+            # next page
+            pages.append([0, 0])
+            x = y = shelf_height = 0
+        places[index] = (len(pages) - 1, x, y)
+        x += width + padding
+        shelf_height = max(shelf_height, height + padding)
+        page = pages[-1]
+        page[0] = max(page[0], x - padding)
+        page[1] = max(page[1], y + height)
+    return places, [tuple(page) for page in pages]
+
+
+def build(images_dir=IMAGES_DIR, page_size=PAGE_SIZE, padding=PADDING):
+    """
+    Pack every source image into atlas pages and write them with their index.
+    """
+    import pygame
+
+    images_dir = Path(images_dir)
+    files = source_files(images_dir)
+    images = [pygame.image.load(str(path)) for path in files]
+    places, page_sizes = pack([image.get_size() for image in images], page_size, padding)
+
+    pages = [pygame.Surface(size, pygame.SRCALPHA) for size in page_sizes]
+    frames = {}
+    for path, image, (page, x, y) in zip(files, images, places):
+        pages[page].blit(image, (x, y))
+        stat = path.stat()
+        frames[path.relative_to(images_dir).as_posix()] = {
+            'page': page,
+            'rect': [x, y, *image.get_size()],
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+        }
+
+    cache_dir = images_dir / CACHE_DIR_NAME
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    page_files = []
+    for number, page in enumerate(pages):
+        name = f'atlas_{number}.png'
+        pygame.image.save(page, str(cache_dir / name))
+        page_files.append(name)
+
+    # write the index last, through a temp file, so it never points at missing pages
+    path = index_path(images_dir)
+    temp_path = path.with_name(path.name + '.tmp')
+    temp_path.write_text(json.dumps({'version': ATLAS_VERSION, 'pages': page_files, 'frames': frames}, indent=1))
+    temp_path.replace(path)
+    return path, len(frames), page_sizes
+
+
+class AtlasIndex:
+    def __init__(self, data, images_dir=IMAGES_DIR):
+        self.images_dir = Path(images_dir)
+        cache_dir = self.images_dir / CACHE_DIR_NAME
+        self.pages = [str(cache_dir / name) for name in data['pages']]
+        # normalised source path -> frame entry
+        self.frames = {os.path.normcase(os.path.normpath(self.images_dir / name)): frame
+                       for name, frame in data['frames'].items()}
+
+    def __len__(self):
+        return len(self.frames)
+
+    def lookup(self, path):
+        """
+        (page path, rect) for a normalised source path, None when it is not packed or changed since.
+        """
+        frame = self.frames.get(path)
+        if frame is None:
+            return None
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        if stat.st_size != frame['size'] or stat.st_mtime_ns != frame['mtime_ns']:
+            return None
+        return self.pages[frame['page']], tuple(frame['rect'])
+
+
+def load_index(images_dir=IMAGES_DIR):
+    """
+    The packed AtlasIndex, or None when the atlases were never built or are unreadable.
+    """
+    try:
+        data = json.loads(index_path(images_dir).read_text())
+    except (OSError, ValueError):
+        return None
+    if data.get('version') != ATLAS_VERSION:
+        return None
+    index = AtlasIndex(data, images_dir)
+    if not all(os.path.exists(page) for page in index.pages):
+        return None
+    return index
+
+
+if __name__ == '__main__':
+    path, count, page_sizes = build(*sys.argv[1:])
+    print(f'{count} images -> {len(page_sizes)} page(s) {page_sizes}, index {path}')
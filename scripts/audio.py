@@ -0,0 +1,140 @@
+import pygame
+from math import sqrt
+
+
+class AudioManager:
+    """
+    Gameplay SFX go through here instead of Sound.play().
+    Requests are queued during the tick and flushed once per frame: identical
+    sounds requested in the same tick become one voice (louder with the count),
+    each sound has a voice limit, and voices run on reserved mixer channels with
+    priorities deciding who gets stolen when they are all busy.
+    """
+    def __init__(self, reserved_channels=8):
+        self.reserved_channels = reserved_channels
+        self.enabled = True
+        self.initialized = False
+
+        self.sounds = {}  # name -> settings dict
+        self.decoded = {}  # path -> Sound, decoded ahead of time by preload()
+        self.pending = {}  # name -> plays requested this tick
+        self.channels = []
+        self.voices = {}  # channel index -> (name, priority, start order)
+        self.voice_order = 0
+
+        # counters
+        self.requested = 0
+        self.issued = 0
+        self.dropped = 0
+
+    def init(self):
+        if self.initialized:
+            return self.enabled
+        self.initialized = True
+        try:
+            if not pygame.mixer.get_init():
+                pygame.mixer.init()
+            # keep some channels free for un-managed sounds like the menu
+            pygame.mixer.set_num_channels(max(pygame.mixer.get_num_channels(), self.reserved_channels * 2))
+            pygame.mixer.set_reserved(self.reserved_channels)
+            self.channels = [pygame.mixer.Channel(i) for i in range(self.reserved_channels)]
+        except pygame.error:
+            self.enabled = False  # no audio device, keep counting requests
+        return self.enabled
+
+    def disable(self):
+        # headless runs, sounds are never loaded and every request is dropped
+        self.initialized = True
+        self.enabled = False
+
+    def load(self, name, path, volume=1.0, max_voices=2, priority=0):
+        """
+        Register a sound once; later calls with the same name are ignored.
+        """
+        if name in self.sounds:
+            return
+        sound = self.decoded.pop(path, None)
+        if sound is None and self.init():
+            sound = pygame.mixer.Sound(path)
+        self.sounds[name] = {
+            'sound': sound,
+            'volume': volume,
+            'max_voices': max_voices,
+            'priority': priority,
+        }
+
+    def preload(self, path):
+        """
+        Decode a sound file for a later load(). Safe off the main thread once init() has run.
+        """
+        if self.enabled and path not in self.decoded:
+            self.decoded[path] = pygame.mixer.Sound(path)
+
+    def play(self, name, count=1):
+        if name not in self.sounds:
+            # fail at the call, not frames later in flush()
+            raise KeyError(f'sound {name!r} was never loaded')
+        self.pending[name] = self.pending.get(name, 0) + count
+        self.requested += count
+
+    def find_channel(self, name, settings):
+        busy = {index for index, channel in enumerate(self.channels) if channel.get_busy()}
+        for index in list(self.voices):
+            if index not in busy:
+                del self.voices[index]
+
+        # at the voice limit, restart this sound's oldest voice
+        own = [index for index, voice in self.voices.items() if voice[0] == name]
+        if len(own) >= settings['max_voices']:
+            return min(own, key=lambda index: self.voices[index][2])
+
+        for index in range(len(self.channels)):
+            if index not in busy:
+                return index
+
+        # all busy, steal the oldest voice with a lower priority
+        lower = [index for index, voice in self.voices.items() if voice[1] < settings['priority']]
+        if lower:
+            return min(lower, key=lambda index: (self.voices[index][1], self.voices[index][2]))
+        return None
+
+    def flush(self):
+        """
+        Issue this tick's requests, highest priority first. Called once per frame.
+        """
+        if not self.pending:
+            return
+        pending = sorted(self.pending.items(), key=lambda item: -self.sounds[item[0]]['priority'])
+        self.pending.clear()
+
+        for name, count in pending:
+            settings = self.sounds[name]
+            index = self.find_channel(name, settings) if self.enabled else None
+            if index is None:
+                self.dropped += count
+                continue
+
+            # one voice for all requests, louder the more were coalesced
+            channel = self.channels[index]
+            channel.set_volume(min(1.0, settings['volume'] * sqrt(count)))
+            channel.play(settings['sound'])
+            self.voices[index] = (name, settings['priority'], self.voice_order)
+            self.voice_order += 1
+            self.issued += 1
+
+    def play_music(self, path, volume=1.0):
+        if not self.init():
+            return
+        pygame.mixer.music.load(path)
+        pygame.mixer.music.set_volume(volume)
+        pygame.mixer.music.play(-1)
+
+    def pause_music(self):
+        if self.enabled:
+            pygame.mixer.music.pause()
+
+    def stats(self):
+        return {'requested': self.requested, 'issued': self.issued, 'dropped': self.dropped}
+
+
+audio = AudioManager()
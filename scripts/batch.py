@@ -0,0 +1,152 @@
+"""
+Batch fights.
+
+Runs many headless fights across worker processes, sweeping boss settings and
+input policies, and collects one row per fight into a CSV, NPZ or Parquet file
+(picked by the output's extension). Rows stream back as fights finish, so a
+long sweep can be watched and a CSV is usable even if the run is cut short.
+
+    python -m scripts.batch --fights 200 --set max_health=3000,5000 --set chase_chance=0.4,0.8 -o sweep.csv
+
+Each fight's seed is the base seed plus its index, so any row can be replayed
+with python -m scripts.headless --seed.
+"""
+import argparse
+import csv
+import itertools
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from scripts.headless import BOSS_SETTINGS
+
+POLICIES = ('bot', 'random')
+
+# per fight results, in output column order
+RESULT_COLUMNS = ('outcome', 'sim_seconds', 'damage_taken', 'bullets_spawned', 'peak_bullets', 'ms_per_tick')
+
+
+def make_jobs(fights, policies, sweep, base_seed, max_seconds):
+    """
+    One job per fight: every combination of policy and swept settings gets `fights` fights.
+    """
+    names = list(sweep)
+    jobs = []
+    for policy in policies:
+        for values in itertools.product(*(sweep[name] for name in names)):
+            settings = dict(zip(names, values))
+            for _ in range(fights):
+                jobs.append({
+                    'fight': len(jobs),
+                    'seed': base_seed + len(jobs),
+                    'policy': policy,
+                    'settings': settings,
+                    'max_seconds': max_seconds,
+                })
+    return jobs
+
+
+def init_worker():
+    from scripts.headless import init_headless
+    init_headless()
+
+
+def run_job(job):
+    from scripts.headless import run_fight
+    from scripts.inputs import ScriptedInput, fight_bot, random_bot
+
+    script = fight_bot if job['policy'] == 'bot' else random_bot(job['seed'])
+    result = run_fight(ScriptedInput(script), job['max_seconds'], job['seed'], job['settings'])
+    # only the compact row goes back through the pipe
+    return job['fight'], tuple(result[column] for column in RESULT_COLUMNS)
+
+
+class ResultWriter:
+    """
+    Collects rows and writes them in the format the path's extension asks for.
+    CSV rows are written as they arrive, NPZ and Parquet once at the end.
+    """
+    def __init__(self, path, columns):
+        self.path = path
+        self.columns = columns
+        self.format = os.path.splitext(path)[1].lower().lstrip('.')
+        if self.format not in ('csv', 'npz', 'parquet'):
+            raise ValueError(f'unsupported output {path!r}, use .csv, .npz or .parquet')
+        self.rows = []
+        self.file = None
+        if self.format == 'csv':
+            self.file = open(path, 'w', newline='')
+            self.csv = csv.writer(self.file)
+            self.csv.writerow(columns)
+
+    def add(self, row):
+        self.rows.append(row)
+        if self.file is not None:
+            self.csv.writerow(row)
+            self.file.flush()
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            return
+        self.rows.sort()
+        data = {column: np.array([row[index] for row in self.rows]) for index, column in enumerate(self.columns)}
+        if self.format == 'npz':
+            np.savez_compressed(self.path, **data)
+        else:
+            try:
+                import pandas
+            except ImportError:
+                raise SystemExit('Parquet output needs pandas and pyarrow, use .csv or .npz instead')
+            pandas.DataFrame(data).to_parquet(self.path)
+
+
+def parse_sweep(assignments):
+    """
+    ['max_health=3000,5000'] -> {'max_health': [3000.0, 5000.0]}
+    """
+    sweep = {}
+    for assignment in assignments:
+        name, _, values = assignment.partition('=')
+        if name not in BOSS_SETTINGS or not values:
+            raise SystemExit(f'--set expects NAME=V1,V2,... with NAME one of {", ".join(BOSS_SETTINGS)}')
+        sweep[name] = [float(value) for value in values.split(',')]
+    return sweep
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run many headless fights in parallel.')
+    parser.add_argument('--fights', type=int, default=100, help='fights per combination of settings and policy')
+    parser.add_argument('--set', action='append', default=[], metavar='NAME=V1,V2',
+                        help=f'sweep a boss setting ({", ".join(BOSS_SETTINGS)}), can be repeated')
+    parser.add_argument('--policy', action='append', choices=POLICIES, help='input policy, can be repeated (default bot)')
+    parser.add_argument('--seconds', type=float, default=300, help='game time limit per fight')
+    parser.add_argument('--seed', type=int, default=0, help='base seed')
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help='worker processes')
+    parser.add_argument('-o', '--output', default='fights.csv', help='.csv, .npz or .parquet')
+    args = parser.parse_args()
+
+    sweep = parse_sweep(args.set)
+    jobs = make_jobs(args.fights, args.policy or ['bot'], sweep, args.seed, args.seconds)
+    setting_names = list(sweep)
+    writer = ResultWriter(args.output, ('fight', 'seed', 'policy', *setting_names, *RESULT_COLUMNS))
+
+    start = time.perf_counter()
+    with ProcessPoolExecutor(args.workers, initializer=init_worker) as executor:
+        futures = [executor.submit(run_job, job) for job in jobs]
+        for done, future in enumerate(as_completed(futures), 1):
+            fight, result = future.result()
+            job = jobs[fight]
+            writer.add((fight, job['seed'], job['policy'], *(job['settings'][name] for name in setting_names), *result))
+            print(f'\r{done}/{len(jobs)} fights', end='', file=sys.stderr)
+    writer.close()
+
+    elapsed = time.perf_counter() - start
+    print(f'\n{len(jobs)} fights in {elapsed:.1f}s with {args.workers} workers -> {args.output}', file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,265 @@
+import pygame
+import numpy as np
+from scripts.memory import memory
+
+# pre-rendered projectile images shared by every bullet, keyed by (kind, phase)
+# and trail stamp sets keyed by ('trail', colour, length)
+_projectile_images = {}
+memory.track_cache('projectile_images', _projectile_images)
+
+
+def render_player_bullet(phase):
+    image = memory.track_surface(pygame.Surface((6, 6)), 'projectile')
+    image.fill("yellow")
+    return image
+
+
+projectile_renderers = {
+    'player': render_player_bullet,
+}
+
+
+def projectile_image(kind, phase=1):
+    """
+    The shared image for a projectile kind and phase, rendered on first use.
+    """
+    key = (kind, phase)
+    image = _projectile_images.get(key)
+    if image is None:
+        image = _projectile_images[key] = projectile_renderers[kind](phase)
+    return image
+
+
+class TrailRenderer:
+    """
+    Draws every bullet trail in one fblits batch from pre-rendered stamps.
+    A trail of length n shows point i (oldest first) shrunk to int(4 * i / n)
+    and faded to half of i / n, so there are only a handful of distinct stamps
+    per colour.
+    """
+    def __init__(self, max_length):
+        self.max_length = max_length
+
+    def get_stamps(self, color):
+        # list of (length, index, surface, radius), shared through the projectile image cache
+        key = ('trail', color, self.max_length)
+        stamps = _projectile_images.get(key)
+        if stamps is None:
+            stamps = _projectile_images[key] = []
+            for length in range(1, self.max_length + 1):
+                for index in range(length):
+                    # Calculate alpha for fading trail and size for shrinking trail
+                    alpha = int(255 * (index / length) * 0.5)
+                    size = int(4 * (index / length))
+                    if size == 0:
+                        continue  # empty surface, nothing to draw
+                    stamp = memory.track_surface(pygame.Surface((size * 2, size * 2), pygame.SRCALPHA), 'trail_stamp')
+                    pygame.draw.circle(stamp, (*color, alpha), (size, size), size)
+                    stamps.append((length, index, stamp, size))
+        return stamps
+
+    def draw(self, surface, camera, trail, head, lengths, colors, shift=None):
+        """
+        trail is a (bullets, max_length, 2) ring buffer whose next write goes to head,
+        lengths and colors hold each bullet's trail length and trail colour key,
+        shift optionally moves each bullet's whole trail.
+        """
+        offset = np.array((camera.offset.x, camera.offset.y))
+        blit_sequence = []
+        for color, selected in colors.items():
+            selected_lengths = lengths[selected]
+            for length, index, stamp, size in self.get_stamps(color):
+                bullets = selected[selected_lengths == length]
+                if not len(bullets):
+                    continue
+                slot = (head - length + index) % self.max_length
+                # truncate like a blit of the stamp's rect moved by the camera
+                points = trail[bullets, slot] if shift is None else trail[bullets, slot] + shift[bullets]
+                dest = np.trunc(points - size - offset).astype(np.int64)
+                blit_sequence.extend(zip([stamp] * len(bullets), map(tuple, dest.tolist())))
+        surface.fblits(blit_sequence)
+
+
+class SpritePool:
+    """
+    Free list of killed sprites, reused instead of constructing new ones.
+    Pooled classes implement reset() with the same arguments as __init__ and
+    hand themselves back with release() when killed.
+    """
+    def __init__(self, sprite_class):
+        self.sprite_class = sprite_class
+        self.free = []
+        self.hits = 0
+        self.misses = 0
+
+    def acquire(self, *args):
+        if self.free:
+            self.hits += 1
+            sprite = self.free.pop()
+            sprite.reset(*args)
+        else:
+            self.misses += 1
+            sprite = self.sprite_class(*args)
+            sprite.pool = self
+        return sprite
+
+    def release(self, sprite):
+        self.free.append(sprite)
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses, 'free': len(self.free)}
+
+
+class BulletManager:
+    """
+    Boss projectiles stored as a struct of arrays.
+    Every tick all live bullets are moved, aged and culled with a handful of
+    numpy operations; dead slots are filled from the tail (swap-remove), so
+    live bullets always occupy [0, count).
+    """
+    def __init__(self, collision_map, capacity=256):
+        self.collision_map = collision_map
+
+        # bullet settings, same for every phase except speed and damage
+        self.size = 8
+        self.hitbox_size = 6  # smaller hitbox to match the visible bullet core
+        # tuned at 60 / 10s while bullets were moved three times per tick
+        self.base_speed = 180
+        self.max_lifetime = 10 / 3  # seconds
+        self.max_trail_length = 5
+
+        # colours per phase: (core, trail)
+        self.colors = {
+            1: ((255, 0, 0), (255, 100, 0)),  # red bullets, orange trail
+            2: ((255, 0, 255), (200, 0, 255)),  # purple bullets, light purple trail
+        }
+
+        self.count = 0
+        self.spawned = 0  # bullets fired over the manager's lifetime
+        self.peak = 0  # most bullets alive at once
+        self.last_dt = 0
+        self.trail_head = 0
+        self.allocate(capacity)
+        self.trail_renderer = TrailRenderer(self.max_trail_length)
+
+    def allocate(self, capacity):
+        self.capacity = capacity
+        self.pos = np.zeros((capacity, 2))
+        self.vel = np.zeros((capacity, 2))
+        self.lifetime = np.zeros(capacity)
+        self.damage = np.zeros(capacity, dtype=np.int32)
+        self.phase = np.zeros(capacity, dtype=np.int8)
+
+        # ring buffer of previous positions, shared write head since every bullet ticks together
+        self.trail = np.zeros((capacity, self.max_trail_length, 2))
+        self.trail_length = np.zeros(capacity, dtype=np.int8)
+
+    def grow(self, needed):
+        capacity = self.capacity
+        while capacity < needed:
+            capacity *= 2
+        old = self.pos, self.vel, self.lifetime, self.damage, self.phase, self.trail, self.trail_length
+        self.allocate(capacity)
+        new = self.pos, self.vel, self.lifetime, self.damage, self.phase, self.trail, self.trail_length
+        for old_array, new_array in zip(old, new):
+            new_array[:self.count] = old_array[:self.count]
+
+    def __len__(self):
+        return self.count
+
+    def clear(self):
+        self.count = 0
+
+    def spawn(self, pos, angle, phase=1):
+        self.spawn_many(pos, [angle], phase)
+
+    def spawn_many(self, pos, angles, phase=1):
+        """
+        Spawn one bullet per angle (degrees) from pos.
+        """
+        angles = np.radians(np.asarray(angles, dtype=np.float64))
+        self.spawn_directions(pos, np.column_stack((np.cos(angles), np.sin(angles))), phase)
+
+    def spawn_directions(self, pos, directions, phase=1):
+        """
+        Spawn one bullet per unit direction vector from pos.
+        """
+        amount = len(directions)
+        if self.count + amount > self.capacity:
+            self.grow(self.count + amount)
+
+        start, end = self.count, self.count + amount
+        speed = self.base_speed * (1 + 0.5 * (phase - 1))
+        self.pos[start:end] = pos
+        self.vel[start:end] = directions
+        self.vel[start:end] *= speed
+        self.lifetime[start:end] = 0
+        self.damage[start:end] = 10 * phase  # more damage in later phases
+        self.phase[start:end] = phase
+        self.trail_length[start:end] = 0
+        self.count = end
+        self.spawned += amount
+        self.peak = max(self.peak, end)
+
+    def kill(self, indices):
+        """
+        Remove the bullets at indices by moving live bullets from the tail into their slots.
+        """
+        indices = np.unique(np.asarray(indices, dtype=np.int64))
+        if not len(indices):
+            return
+        new_count = self.count - len(indices)
+
+        # dead slots below the new count are holes, live slots above it fill them
+        holes = indices[indices < new_count]
+        tail_alive = np.ones(self.count - new_count, dtype=bool)
+        tail_alive[indices[indices >= new_count] - new_count] = False
+        movers = np.flatnonzero(tail_alive) + new_count
+
+        for array in (self.pos, self.vel, self.lifetime, self.damage, self.phase, self.trail, self.trail_length):
+            array[holes] = array[movers]
+        self.count = new_count
+
+    def update(self, dt):
+        count = self.count
+        if not count:
+            return
+        pos = self.pos[:count]
+
+        # store previous position for the trail
+        self.trail[:count, self.trail_head] = pos
+        self.trail_head = (self.trail_head + 1) % self.max_trail_length
+        np.minimum(self.trail_length[:count] + 1, self.max_trail_length, out=self.trail_length[:count])
+
+        # move
+        pos += self.vel[:count] * dt
+        self.last_dt = dt
+
+        # walls and lifetime
+        half = self.hitbox_size / 2
+        dead = self.collision_map.overlaps_boxes(pos[:, 0], pos[:, 1], half, half)
+        self.lifetime[:count] += dt
+        dead |= self.lifetime[:count] >= self.max_lifetime
+        if dead.any():
+            self.kill(np.flatnonzero(dead))
+
+    def visible(self, camera):
+        # trails sit behind the bullet, a margin keeps them from popping at the edges
+        view = camera.view_rect.inflate(camera.cull_margin * 2, camera.cull_margin * 2)
+        pos = self.pos[:self.count]
+        on_screen = ((pos[:, 0] > view.left) & (pos[:, 0] < view.right) &
+                     (pos[:, 1] > view.top) & (pos[:, 1] < view.bottom))
+        return np.flatnonzero(on_screen)
+
+    def draw(self, surface, camera, alpha=1.0):
+        visible = self.visible(camera)
+        if not len(visible):
+            return
+        # pull trails back along the velocity to where bullets were alpha into the last step
+        shift = self.vel[:self.count] * ((alpha - 1) * self.last_dt)
+        phases = self.phase[visible]
+        colors = {}
+        for phase in np.unique(phases).tolist():
+            trail_color = self.colors.get(phase, self.colors[2])[1]
+            colors[trail_color] = visible[phases == phase]
+        self.trail_renderer.draw(surface, camera, self.trail, self.trail_head, self.trail_length, colors, shift)
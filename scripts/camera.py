@@ -1,24 +1,32 @@
 import pygame
+from contextlib import contextmanager
 from scripts.screenshake import ScreenShake
 class Camera:
-    def __init__(self, width, height, map_width, map_height, offset_limit=80, smoothing=0.15):
+    def __init__(self, width, height, map_width, map_height, controls, rng=None, offset_limit=80, smoothing=0.15, cull_margin=16):
         self.width = width
         self.height = height
         self.map_width = map_width
         self.map_height = map_height
         self.offset_limit = offset_limit
         self.smoothing = smoothing
+        self.controls = controls  # the mouse pulls the view ahead
 
         self.offset = pygame.Vector2()
+        self.previous_offset = pygame.Vector2()  # offset at the start of the last step
         self.target = pygame.Vector2()
         self.initialized = False  # Flag to track if we've initialized with player position
 
          # Screenshake
-        self.screen_shake = ScreenShake()
+        self.screen_shake = ScreenShake(rng)
+
+        # Culling, margin covers trails and effects drawn outside a sprite's rect
+        self.cull_margin = cull_margin
+        self.drawn = 0
+        self.culled = 0
 
     def start_screen_shake(self, duration, intensity=5):
         self.screen_shake.start(duration, intensity)
-    def update(self, target_rect):
+    def update(self, target_rect, dt=1 / 60):
         # Get target center
         target_center = pygame.Vector2(target_rect.center)
 
@@ -29,11 +37,12 @@ class Camera:
             # Clamp to map boundaries
             self.offset.x = max(0, min(self.offset.x, self.map_width - self.width))
             self.offset.y = max(0, min(self.offset.y, self.map_height - self.height))
+            self.previous_offset = self.offset.copy()
             self.initialized = True
             return
 
         # Mouse position logic
-        mouse_x, mouse_y = pygame.mouse.get_pos()
+        mouse_x, mouse_y = self.controls.get_mouse_pos()
         screen_center = pygame.Vector2(self.width // 2, self.height // 2)
         mouse_offset = pygame.Vector2(mouse_x, mouse_y) - screen_center
 
@@ -43,11 +52,11 @@ class Camera:
         # Calculate total target offset
         desired_offset = target_center + mouse_offset - screen_center
 
-        # Smooth follow
-        self.offset += (desired_offset - self.offset) * self.smoothing
+        # Smooth follow, smoothing is the fraction covered per 60 FPS frame
+        self.offset += (desired_offset - self.offset) * (1 - (1 - self.smoothing) ** (dt * 60))
         
         # Apply screen shake
-        shake_offset_x, shake_offset_y = self.screen_shake.update()
+        shake_offset_x, shake_offset_y = self.screen_shake.update(dt)
         self.offset.x += shake_offset_x
         self.offset.y += shake_offset_y
 
@@ -56,4 +65,25 @@ class Camera:
         self.offset.y = max(0, min(self.offset.y, self.map_height - self.height))
 
     def apply(self, target_rect):
-        return target_rect.move(-self.offset.x, -self.offset.y)
\ No newline at end of file
+        return target_rect.move(-self.offset.x, -self.offset.y)
+
+    @contextmanager
+    def interpolated(self, alpha):
+        # draw with the offset blended between the last two steps, then restore it
+        offset = self.offset
+        self.offset = self.previous_offset.lerp(offset, alpha)
+        try:
+            yield
+        finally:
+            self.offset = offset
+
+    @property
+    def view_rect(self):
+        return pygame.FRect(self.offset.x, self.offset.y, self.width, self.height)
+
+    def visible_sprites(self, index):
+        # query the spatial index for sprites near the view and count what was skipped
+        visible = index.query(self.view_rect.inflate(self.cull_margin * 2, self.cull_margin * 2))
+        self.drawn = len(visible)
+        self.culled = len(index) - self.drawn
+        return visible
@@ -1,13 +1,228 @@
 import pygame
+import numpy as np
+from math import floor
+from scripts.settings import TILE_SIZE
 
-class Sprite(pygame.sprite.Sprite):
-    def __init__(self, pos, surf, groups):
-        super().__init__(groups)
-        self.image = surf
-        self.rect = self.image.get_frect(topleft=pos)
-
-class CollisionSprite(pygame.sprite.Sprite):
-    def __init__(self, pos, surf, groups):
-        super().__init__(groups)
-        self.image = surf
-        self.rect = self.image.get_frect(topleft=pos)
\ No newline at end of file
+
+class OccupancyGrid:
+    """
+    Static rects (walls, water) rasterised into a cell bitmap.
+    Each occupied cell keeps the indices of the rects touching it, so point and
+    AABB queries only look at the cells under the query, not at every rect.
+    """
+    def __init__(self, rects, cell_size=TILE_SIZE):
+        self.cell_size = cell_size
+        self.rects = [pygame.FRect(rect) for rect in rects]
+        self.rect_array = np.array([tuple(rect) for rect in self.rects], dtype=np.float64).reshape(-1, 4)
+
+        # grid covers every rect, objects can stick out of the map
+        if self.rects:
+            self.origin_x = floor(min(rect.left for rect in self.rects) / cell_size)
+            self.origin_y = floor(min(rect.top for rect in self.rects) / cell_size)
+            columns = floor(max(rect.right for rect in self.rects) / cell_size) - self.origin_x + 1
+            rows = floor(max(rect.bottom for rect in self.rects) / cell_size) - self.origin_y + 1
+        else:
+            self.origin_x = self.origin_y = 0
+            columns = rows = 0
+
+        self.mask = np.zeros((rows, columns), dtype=bool)
+        self.cells = {}  # (column, row) -> tuple of rect indices
+        for index, rect in enumerate(self.rects):
+            left, top, right, bottom = self.cell_range(rect)
+            self.mask[top:bottom, left:right] = True
+            for row in range(top, bottom):
+                for column in range(left, right):
+                    self.cells[(column, row)] = self.cells.get((column, row), ()) + (index,)
+
+    def cell_range(self, rect):
+        """
+        Cells under rect as (left, top, right, bottom), right/bottom exclusive and clipped to the grid.
+        """
+        size = self.cell_size
+        rows, columns = self.mask.shape
+        left = max(floor(rect.left / size) - self.origin_x, 0)
+        top = max(floor(rect.top / size) - self.origin_y, 0)
+        right = min(floor(rect.right / size) - self.origin_x + 1, columns)
+        bottom = min(floor(rect.bottom / size) - self.origin_y + 1, rows)
+        return left, top, right, bottom
+
+    def point_blocked(self, x, y):
+        column = floor(x / self.cell_size) - self.origin_x
+        row = floor(y / self.cell_size) - self.origin_y
+        rows, columns = self.mask.shape
+        if not (0 <= column < columns and 0 <= row < rows) or not self.mask[row, column]:
+            return False
+        return any(self.rects[index].collidepoint(x, y) for index in self.cells[(column, row)])
+
+    def candidates(self, rect):
+        """
+        Rects sharing a cell with rect, in map order.
+        """
+        left, top, right, bottom = self.cell_range(rect)
+        if left >= right or top >= bottom or not self.mask[top:bottom, left:right].any():
+            return []
+        indices = set()
+        for row in range(top, bottom):
+            for column in range(left, right):
+                indices.update(self.cells.get((column, row), ()))
+        return [self.rects[index] for index in sorted(indices)]
+
+    def hits(self, rect):
+        """
+        Rects overlapping rect, in map order, for collision resolution.
+        """
+        return [other for other in self.candidates(rect) if other.colliderect(rect)]
+
+    def overlaps(self, rect):
+        return any(other.colliderect(rect) for other in self.candidates(rect))
+
+    def overlaps_boxes(self, xs, ys, half_width, half_height):
+        """
+        Vectorised overlaps() for many same-sized boxes centred on xs, ys.
+        Boxes must not be larger than a cell, so their corners cover every cell they touch.
+        """
+        hit = np.zeros(len(xs), dtype=bool)
+        rows, columns = self.mask.shape
+        if not len(xs) or not rows:
+            return hit
+
+        # broadphase: any corner in an occupied cell
+        candidate = np.zeros(len(xs), dtype=bool)
+        for corner_x in (xs - half_width, xs + half_width):
+            column = np.floor(corner_x / self.cell_size).astype(np.int64) - self.origin_x
+            for corner_y in (ys - half_height, ys + half_height):
+                row = np.floor(corner_y / self.cell_size).astype(np.int64) - self.origin_y
+                inside = (column >= 0) & (column < columns) & (row >= 0) & (row < rows)
+                candidate[inside] |= self.mask[row[inside], column[inside]]
+
+        # exact test only for boxes near a rect
+        indices = np.flatnonzero(candidate)
+        if len(indices):
+            rects = self.rect_array
+            left = (xs[indices] - half_width)[:, None]
+            right = (xs[indices] + half_width)[:, None]
+            top = (ys[indices] - half_height)[:, None]
+            bottom = (ys[indices] + half_height)[:, None]
+            overlap = ((left < rects[:, 0] + rects[:, 2]) & (right > rects[:, 0]) &
+                       (top < rects[:, 1] + rects[:, 3]) & (bottom > rects[:, 1]))
+            hit[indices] = overlap.any(axis=1)
+        return hit
+
+
+class SpatialHash:
+    """
+    Uniform-grid broadphase for moving targets, cleared and refilled every tick.
+    Projectiles query it for the targets sharing their cells, so hit detection
+    stays near-linear in projectiles + targets. candidates and hits count the
+    pairs tested and the true overlaps since the last clear().
+    """
+    def __init__(self, cell_size=32):
+        self.cell_size = cell_size
+        self.cells = {}  # (cell_x, cell_y) -> list of (item, rect)
+        self.count = 0
+        self.candidates = 0
+        self.hits = 0
+
+    def __len__(self):
+        return self.count
+
+    def clear(self):
+        self.cells.clear()
+        self.count = 0
+        self.candidates = 0
+        self.hits = 0
+
+    def cell_range(self, rect):
+        size = self.cell_size
+        return (floor(rect.left / size), floor(rect.top / size),
+                floor(rect.right / size), floor(rect.bottom / size))
+
+    def insert(self, item, rect=None):
+        rect = item.rect if rect is None else rect
+        left, top, right, bottom = self.cell_range(rect)
+        for cell_y in range(top, bottom + 1):
+            for cell_x in range(left, right + 1):
+                self.cells.setdefault((cell_x, cell_y), []).append((item, rect))
+        self.count += 1
+
+    def insert_group(self, sprites):
+        for sprite in sprites:
+            self.insert(sprite)
+
+    def nearby(self, rect):
+        """
+        Unique (item, rect) entries sharing a cell with rect, in insertion order.
+        """
+        found = {}
+        left, top, right, bottom = self.cell_range(rect)
+        for cell_y in range(top, bottom + 1):
+            for cell_x in range(left, right + 1):
+                for item, item_rect in self.cells.get((cell_x, cell_y), ()):
+                    found.setdefault(id(item), (item, item_rect))
+        return list(found.values())
+
+    def query_rect(self, rect):
+        hits = []
+        for item, item_rect in self.nearby(rect):
+            self.candidates += 1
+            if item_rect.colliderect(rect):
+                hits.append(item)
+        self.hits += len(hits)
+        return hits
+
+    def query_radius(self, center, radius):
+        """
+        Items whose rect comes within radius of center.
+        """
+        x, y = center
+        area = pygame.FRect(x - radius, y - radius, radius * 2, radius * 2)
+        hits = []
+        for item, item_rect in self.nearby(area):
+            self.candidates += 1
+            # closest point of the rect to the centre
+            closest_x = min(max(x, item_rect.left), item_rect.right)
+            closest_y = min(max(y, item_rect.top), item_rect.bottom)
+            if (closest_x - x) ** 2 + (closest_y - y) ** 2 <= radius * radius:
+                hits.append(item)
+        self.hits += len(hits)
+        return hits
+
+    def query_pairs(self, sprites):
+        """
+        (sprite, item) for every sprite overlapping an item in the hash.
+        """
+        pairs = []
+        for sprite in sprites:
+            for item in self.query_rect(sprite.rect):
+                pairs.append((sprite, item))
+        return pairs
+
+    def query_boxes(self, xs, ys, half_width, half_height):
+        """
+        (index, item) overlaps for many same-sized boxes centred on xs, ys, e.g. the
+        boss BulletManager arrays. Boxes must not be larger than a cell.
+        """
+        if not self.cells or not len(xs):
+            return []
+
+        # broadphase: any corner of a box in an occupied cell, cells packed into one int64 key
+        occupied = np.array(list(self.cells), dtype=np.int64)
+        occupied_keys = (occupied[:, 0] << 32) + occupied[:, 1]
+        candidate = np.zeros(len(xs), dtype=bool)
+        for corner_x in (xs - half_width, xs + half_width):
+            cell_x = np.floor(corner_x / self.cell_size).astype(np.int64)
+            for corner_y in (ys - half_height, ys + half_height):
+                cell_y = np.floor(corner_y / self.cell_size).astype(np.int64)
+                candidate |= np.isin((cell_x << 32) + cell_y, occupied_keys)
+
+        pairs = []
+        for index in np.flatnonzero(candidate).tolist():
+            x, y = float(xs[index]), float(ys[index])
+            box = pygame.FRect(x - half_width, y - half_height, half_width * 2, half_height * 2)
+            for item, rect in self.nearby(box):
+                self.candidates += 1
+                if (x - half_width < rect.right and x + half_width > rect.left and
+                        y - half_height < rect.bottom and y + half_height > rect.top):
+                    pairs.append((index, item))
+                    self.hits += 1
+        return pairs
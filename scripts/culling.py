@@ -0,0 +1,115 @@
+import pygame
+
+
+class SpatialIndex:
+    """
+    Uniform grid over drawable sprites, queried by the camera for the visible set.
+    Static sprites are binned once, dynamic sprites are re-binned only when they
+    cross into a different set of cells.
+    """
+    def __init__(self, cell_size=64):
+        self.cell_size = cell_size
+        self.cells = {}  # (cell_x, cell_y) -> set of sprites
+        self.entries = {}  # sprite -> [cell range, draw layer, insertion order]
+        self.dynamic = set()
+        self.order = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, sprite):
+        return sprite in self.entries
+
+    def cell_range(self, rect):
+        size = self.cell_size
+        return (int(rect.left // size), int(rect.top // size),
+                int(rect.right // size), int(rect.bottom // size))
+
+    def bin(self, sprite, cell_range):
+        if cell_range is None:
+            return
+        left, top, right, bottom = cell_range
+        for cell_y in range(top, bottom + 1):
+            for cell_x in range(left, right + 1):
+                self.cells.setdefault((cell_x, cell_y), set()).add(sprite)
+
+    def unbin(self, sprite, cell_range):
+        if cell_range is None:
+            return
+        left, top, right, bottom = cell_range
+        for cell_y in range(top, bottom + 1):
+            for cell_x in range(left, right + 1):
+                cell = self.cells.get((cell_x, cell_y))
+                if cell is not None:
+                    cell.discard(sprite)
+                    if not cell:
+                        del self.cells[(cell_x, cell_y)]
+
+    def add(self, sprite, layer=0, static=False):
+        if sprite in self.entries:
+            return
+        # sprites join their groups before setting a rect, those get binned on the next update
+        rect = getattr(sprite, 'rect', None)
+        cell_range = self.cell_range(rect) if rect is not None else None
+        self.entries[sprite] = [cell_range, layer, self.order]
+        self.order += 1
+        self.bin(sprite, cell_range)
+        if not static:
+            self.dynamic.add(sprite)
+
+    def remove(self, sprite):
+        entry = self.entries.pop(sprite, None)
+        if entry is not None:
+            self.unbin(sprite, entry[0])
+            self.dynamic.discard(sprite)
+
+    def clear(self):
+        self.cells.clear()
+        self.entries.clear()
+        self.dynamic.clear()
+        self.order = 0
+
+    def update(self):
+        """
+        Re-bin dynamic sprites whose cell range changed since the last update.
+        """
+        for sprite in self.dynamic:
+            entry = self.entries[sprite]
+            cell_range = self.cell_range(sprite.rect)
+            if cell_range != entry[0]:
+                self.unbin(sprite, entry[0])
+                self.bin(sprite, cell_range)
+                entry[0] = cell_range
+
+    def query(self, rect):
+        """
+        Sprites whose cells overlap rect, in draw order (layer, then insertion).
+        """
+        found = set()
+        left, top, right, bottom = self.cell_range(rect)
+        for cell_y in range(top, bottom + 1):
+            for cell_x in range(left, right + 1):
+                cell = self.cells.get((cell_x, cell_y))
+                if cell:
+                    found.update(cell)
+        entries = self.entries
+        return sorted(found, key=lambda sprite: (entries[sprite][1], entries[sprite][2]))
+
+
+class IndexedGroup(pygame.sprite.Group):
+    """
+    Sprite group that keeps a SpatialIndex in sync as sprites are added and killed.
+    Sprites can set draw_layer to override the group's layer.
+    """
+    def __init__(self, index, layer=0, *sprites):
+        self.index = index
+        self.layer = layer
+        super().__init__(*sprites)
+
+    def add_internal(self, sprite, layer=None):
+        super().add_internal(sprite, layer)
+        self.index.add(sprite, getattr(sprite, 'draw_layer', self.layer))
+
+    def remove_internal(self, sprite):
+        super().remove_internal(sprite)
+        self.index.remove(sprite)
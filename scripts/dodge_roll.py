@@ -1,6 +1,8 @@
 import pygame
 from math import sin
 from os.path import join
+from scripts.audio import audio
+from scripts.memory import memory
 
 class DodgeRoll:
     def __init__(self, player):
@@ -23,13 +25,8 @@ class DodgeRoll:
         # for slight vertical bounce effect
         self.roll_height_modifier = 0
         
-        # initialize mixer if not already done
-        if not pygame.mixer.get_init():
-            pygame.mixer.init()
-        
         # load dodge sound once
-        self.dodge_sound = pygame.mixer.Sound("data/sound/sfx/dodge.wav")
-        self.dodge_sound.set_volume(0.1) 
+        audio.load('dodge', "data/sound/sfx/dodge.wav", volume=0.1, max_voices=1, priority=2)
 
     def start_roll(self, direction):
         # can't start roll if already rolling or on cooldown
@@ -55,7 +52,7 @@ class DodgeRoll:
         self.player.direction = self.roll_direction.copy()
 
         # play sound
-        self.dodge_sound.play()
+        audio.play('dodge')
         
         return True
         
@@ -124,7 +121,7 @@ class DodgeRoll:
             return
             
         # create transparent trail surface
-        trail_surf = pygame.Surface((self.player.rect.width, self.player.rect.height), pygame.SRCALPHA)
+        trail_surf = memory.track_surface(pygame.Surface((self.player.rect.width, self.player.rect.height), pygame.SRCALPHA), 'roll_trail')
         trail_surf.fill((255, 255, 255, alpha))  # white with fading alpha
         
         # get player position on screen
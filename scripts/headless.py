@@ -0,0 +1,155 @@
+"""
+Headless simulation.
+
+Runs the Gameplay state on SDL's dummy video and audio drivers with scripted
+input, stepping the fixed-rate simulation as fast as the CPU allows and never
+drawing. Used for benchmarks, automated checks and balance runs.
+
+Run one bot fight, record it or replay a recording with:
+    python -m scripts.headless [--seconds N] [--seed N] [--record FILE | --replay FILE]
+"""
+import argparse
+import hashlib
+import os
+import time
+
+
+def init_headless():
+    """
+    Start pygame without a window or sound device. Safe to call more than once.
+    """
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+    import pygame
+    from scripts.settings import WIDTH, HEIGHT
+    from scripts.audio import audio
+
+    audio.disable()
+    if not pygame.get_init():
+        pygame.init()
+    # states and sprite loading need a display surface to convert images against
+    if pygame.display.get_surface() is None:
+        pygame.display.set_mode((WIDTH, HEIGHT))
+
+
+def make_gameplay(controls, seed=None):
+    from scripts.states.gameplay import Gameplay
+
+    gameplay = Gameplay()
+    gameplay.controls = controls
+    gameplay.seed = seed
+    gameplay.startup({"victory": False, "restart": False})
+    return gameplay
+
+
+def state_digest(gameplay):
+    """
+    Hash of the simulation state, equal for two runs only if they ended identically.
+    """
+    player, boss = gameplay.player, gameplay.boss
+    bullets = boss.bullets
+    digest = hashlib.sha1()
+    digest.update(repr((tuple(player.rect), player.health, tuple(boss.rect), boss.health,
+                        boss.phase, boss.current_state)).encode())
+    digest.update(bullets.pos[:bullets.count].tobytes())
+    digest.update(bullets.vel[:bullets.count].tobytes())
+    return digest.hexdigest()
+
+
+# Boss settings a run can override, name -> the attributes it sets
+BOSS_SETTINGS = {
+    'max_health': ('max_health', 'health'),
+    'attack_cooldown': ('attack_cooldown',),
+    'chase_chance': ('chase_chance',),
+    'bullet_speed': ('bullets.base_speed',),
+}
+
+
+def apply_boss_settings(boss, settings):
+    for name, value in settings.items():
+        if name not in BOSS_SETTINGS:
+            raise KeyError(f'unknown boss setting {name!r}, expected one of {", ".join(BOSS_SETTINGS)}')
+        for path in BOSS_SETTINGS[name]:
+            *owners, attribute = path.split('.')
+            target = boss
+            for owner in owners:
+                target = getattr(target, owner)
+            setattr(target, attribute, value)
+
+
+def run_fight(controls=None, max_seconds=300, seed=None, boss_settings=None):
+    """
+    Simulate one fight until it ends or max_seconds of game time pass.
+    controls defaults to the fight bot, boss_settings overrides BOSS_SETTINGS.
+    Returns a summary dict.
+    """
+    init_headless()
+    from scripts.audio import audio
+    from scripts.simclock import sim_clock
+    from scripts.inputs import ScriptedInput, fight_bot
+
+    controls = controls or ScriptedInput(fight_bot)
+    gameplay = make_gameplay(controls, seed)
+    apply_boss_settings(gameplay.boss, boss_settings or {})
+    step = sim_clock.step
+    max_ticks = int(max_seconds / step)
+
+    start = time.perf_counter()
+    ticks = 0
+    while not gameplay.done and ticks < max_ticks:
+        sim_clock.advance(step)
+        gameplay.update(step)
+        audio.flush()
+        ticks += 1
+    wall_time = time.perf_counter() - start
+    controls.close()
+
+    if gameplay.done:
+        outcome = 'victory' if gameplay.persist.get('victory') else 'defeat'
+    else:
+        outcome = 'timeout'
+    return {
+        'seed': gameplay.run_seed,
+        'outcome': outcome,
+        'ticks': ticks,
+        'sim_seconds': ticks * step,
+        'wall_seconds': wall_time,
+        'ms_per_tick': wall_time * 1000 / max(ticks, 1),
+        'boss_health': gameplay.boss.health,
+        'player_health': gameplay.player.health,
+        'damage_taken': gameplay.player.max_health - gameplay.player.health,
+        'boss_bullets': len(gameplay.boss.bullets),
+        'bullets_spawned': gameplay.boss.bullets.spawned,
+        'peak_bullets': gameplay.boss.bullets.peak,
+        'digest': state_digest(gameplay),
+    }
+
+
+def main():
+    from scripts.replay import seed_arg
+
+    parser = argparse.ArgumentParser(description='Simulate a fight without a window.')
+    parser.add_argument('--seconds', type=float, default=300, help='game time limit')
+    parser.add_argument('--seed', type=seed_arg, help='fight seed, random by default')
+    parser.add_argument('--record', help='write the fight\'s input to this file')
+    parser.add_argument('--replay', help='play back a recorded fight')
+    args = parser.parse_args()
+
+    init_headless()
+    from scripts.inputs import ScriptedInput, fight_bot
+    from scripts.replay import InputRecorder, ReplayInput
+
+    if args.replay:
+        controls = ReplayInput(args.replay)
+    else:
+        controls = ScriptedInput(fight_bot)
+    if args.record:
+        controls = InputRecorder(controls, args.record)
+
+    result = run_fight(controls, args.seconds, args.seed)
+    for key, value in result.items():
+        print(f'{key}: {value}')
+
+
+if __name__ == '__main__':
+    main()
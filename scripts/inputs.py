@@ -0,0 +1,121 @@
+import pygame
+import random
+
+
+class KeyState:
+    """
+    Pressed keys from a set, indexed like pygame.key.get_pressed().
+    """
+    def __init__(self, keys=()):
+        self.keys = frozenset(keys)
+
+    def __getitem__(self, key):
+        return key in self.keys
+
+
+class InputFrame:
+    """
+    Everything gameplay reads from the devices during one tick.
+    mouse_pos is in screen space like pygame.mouse.get_pos().
+    """
+    def __init__(self, keys=(), buttons=(False, False, False), mouse_pos=(0, 0)):
+        self.keys = KeyState(keys)
+        self.buttons = tuple(bool(button) for button in buttons)
+        self.mouse_pos = tuple(mouse_pos)
+
+
+class InputProvider:
+    """
+    Source of player input. Gameplay calls poll() once per simulation tick and
+    every reader sees the same snapshot for the rest of that tick.
+    A provider with a seed (a replay) decides the seed of the fights it plays.
+    """
+    seed = None
+
+    def __init__(self):
+        self.frame = InputFrame()
+
+    def start(self, seed, sim_hz):
+        # a fight is starting with this seed
+        pass
+
+    def poll(self, state):
+        pass
+
+    def close(self):
+        pass
+
+    def get_pressed(self):
+        return self.frame.keys
+
+    def get_mouse_pressed(self):
+        return self.frame.buttons
+
+    def get_mouse_pos(self):
+        return self.frame.mouse_pos
+
+
+class DeviceInput(InputProvider):
+    """
+    Live keyboard and mouse.
+    """
+    def poll(self, state):
+        self.frame = InputFrame()
+        self.frame.keys = pygame.key.get_pressed()
+        self.frame.buttons = pygame.mouse.get_pressed()
+        self.frame.mouse_pos = pygame.mouse.get_pos()
+
+
+class ScriptedInput(InputProvider):
+    """
+    Input produced by script(tick, state) -> InputFrame, for bots and tests.
+    The script sees the gameplay state, so it can aim at things on screen.
+    """
+    def __init__(self, script):
+        super().__init__()
+        self.script = script
+        self.tick = 0
+
+    def start(self, seed, sim_hz):
+        self.tick = 0
+
+    def poll(self, state):
+        self.frame = self.script(self.tick, state)
+        self.tick += 1
+
+
+def fight_bot(tick, state):
+    """
+    Holds the trigger on the boss and strafes around it, dodge rolling now and then.
+    """
+    # whole pixels like a real mouse, so recordings of the bot replay exactly
+    x, y = state.camera.apply(state.boss.rect).center
+    aim = (int(x), int(y))
+    # change strafe direction every second at 120 Hz
+    moves = [(pygame.K_w, pygame.K_a), (pygame.K_a, pygame.K_s), (pygame.K_s, pygame.K_d), (pygame.K_d, pygame.K_w)]
+    keys = list(moves[(tick // 120) % len(moves)])
+    if tick % 90 == 0:
+        keys.append(pygame.K_LSHIFT)
+    return InputFrame(keys, (True, False, False), aim)
+
+
+def random_bot(seed):
+    """
+    A fight_bot-like script with its own seeded stream: random strafing and
+    rolls, shooting near the boss with some aim error.
+    """
+    rng = random.Random(seed)
+    movement_keys = (pygame.K_w, pygame.K_a, pygame.K_s, pygame.K_d)
+    held = []
+
+    def script(tick, state):
+        # pick new movement keys about four times a second
+        if tick % 30 == 0:
+            held[:] = [key for key in movement_keys if rng.random() < 0.35]
+        keys = list(held)
+        if rng.random() < 0.01:
+            keys.append(pygame.K_LSHIFT)
+        x, y = state.camera.apply(state.boss.rect).center
+        aim = (int(x + rng.gauss(0, 12)), int(y + rng.gauss(0, 12)))
+        return InputFrame(keys, (rng.random() < 0.8, False, False), aim)
+    return script
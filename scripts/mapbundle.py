@@ -0,0 +1,251 @@
+"""
+Compiled map bundles.
+
+A bundle holds everything TileMap needs from a .tmx file: a tile atlas, one
+array of atlas slots per tile layer, the rects of every object layer and the
+entity table. Bundles are cached next to the maps and keyed on a hash of the
+.tmx and the tilesets/images it references, so editing a map in Tiled
+invalidates its bundle. pytmx is only imported when a bundle has to be
+(re)compiled.
+
+Precompile every map with:
+    python -m scripts.mapbundle
+"""
+import hashlib
+import json
+import re
+import sys
+from pathlib import Path
+
+import numpy as np
+
+from scripts.memory import memory
+
+BUNDLE_VERSION = 1
+CACHE_DIR_NAME = '.cache'
+ENTITY_LAYER = 'Entities'
+
+# compiled bundles already loaded by this process, keyed by tmx path
+_loaded = {}
+memory.track_cache('map_bundles', lambda: [array for bundle in _loaded.values()
+                                           for array in (bundle.atlas, *bundle.layers.values(), *bundle.rects.values())])
+
+_source_pattern = re.compile(rb'<(?:tileset|image)\b[^>]*\bsource="([^"]+)"')
+
+
+def source_files(tmx_path):
+    """
+    The .tmx file plus every tileset and image it references, in a stable order.
+    """
+    tmx_path = Path(tmx_path)
+    files = [tmx_path]
+    pending = [tmx_path]
+    while pending:
+        path = pending.pop()
+        for match in _source_pattern.finditer(path.read_bytes()):
+            source = (path.parent / match.group(1).decode()).resolve()
+            if source not in files:
+                files.append(source)
+                if source.suffix in ('.tsx', '.tx'):
+                    pending.append(source)
+    return files
+
+
+def source_digest(tmx_path):
+    digest = hashlib.sha1(b'mapbundle-%d' % BUNDLE_VERSION)
+    for path in source_files(tmx_path):
+        digest.update(Path(path).name.encode())
+        digest.update(Path(path).read_bytes())
+    return digest.hexdigest()
+
+
+def bundle_path(tmx_path):
+    tmx_path = Path(tmx_path)
+    return tmx_path.parent / CACHE_DIR_NAME / (tmx_path.stem + '.mapbundle.npz')
+
+
+class MapBundle:
+    def __init__(self, arrays):
+        self.meta = json.loads(str(arrays['meta']))
+        self.digest = self.meta['digest']
+        self.width = self.meta['width']
+        self.height = self.meta['height']
+        self.tilewidth = self.meta['tilewidth']
+        self.tileheight = self.meta['tileheight']
+        self.layer_names = self.meta['layers']
+        self.object_layer_names = self.meta['object_layers']
+
+        # atlas is RGBA, tile slots are laid out left to right, top to bottom
+        self.atlas = arrays['atlas']
+        self.atlas_columns = self.meta['atlas_columns']
+        self.tile_count = self.meta['tile_count']
+
+        # atlas slot + 1 for each tile, 0 means empty
+        self.layers = {name: arrays['layer_' + name] for name in self.layer_names}
+        self.rects = {name: arrays['rects_' + name] for name in self.object_layer_names}
+        self.object_names = {name: arrays['names_' + name].tolist() for name in self.object_layer_names}
+
+    def layer(self, name):
+        return self.layers[name]
+
+    def object_rects(self, name):
+        return self.rects[name]
+
+    @property
+    def entities(self):
+        """
+        The entity table as (name, x, y) in map order.
+        """
+        if ENTITY_LAYER not in self.rects:
+            return []
+        names = self.object_names[ENTITY_LAYER]
+        rects = self.rects[ENTITY_LAYER]
+        return [(name, float(x), float(y)) for name, (x, y, _, _) in zip(names, rects)]
+
+    def atlas_rect(self, slot):
+        column, row = slot % self.atlas_columns, slot // self.atlas_columns
+        return (column * self.tilewidth, row * self.tileheight, self.tilewidth, self.tileheight)
+
+
+def compile_map(tmx_path, digest=None):
+    """
+    Parse a .tmx with pytmx and return the bundle arrays.
+    Needs a display mode to be set, pytmx converts the tileset images.
+    """
+    import pygame
+    from pytmx import TiledTileLayer, TiledObjectGroup
+    from pytmx.util_pygame import load_pygame
+
+    tmx_data = load_pygame(str(tmx_path))
+    tilewidth, tileheight = tmx_data.tilewidth, tmx_data.tileheight
+
+    arrays = {}
+    layer_names = []
+    object_layer_names = []
+
+    # every gid that is actually placed gets one atlas slot
+    slots = {}
+    tiles = []
+    for layer in tmx_data.layers:
+        if not isinstance(layer, TiledTileLayer):
+            continue
+        grid = np.zeros((tmx_data.height, tmx_data.width), dtype=np.uint16)
+        for y, row in enumerate(layer.data):
+            for x, gid in enumerate(row):
+                image = tmx_data.images[gid] if gid else None
+                if image is None:
+                    continue
+                if gid not in slots:
+                    slots[gid] = len(tiles)
+                    tiles.append(image)
+                grid[y, x] = slots[gid] + 1
+        arrays['layer_' + layer.name] = grid
+        layer_names.append(layer.name)
+
+    for layer in tmx_data.layers:
+        if not isinstance(layer, TiledObjectGroup):
+            continue
+        rects = np.array([(obj.x, obj.y, obj.width, obj.height) for obj in layer], dtype=np.float32).reshape(-1, 4)
+        arrays['rects_' + layer.name] = rects
+        arrays['names_' + layer.name] = np.array([obj.name or '' for obj in layer], dtype=str)
+        object_layer_names.append(layer.name)
+
+    # pack the tiles into a square-ish atlas
+    columns = max(1, int(np.ceil(np.sqrt(len(tiles)))))
+    rows = max(1, -(-len(tiles) // columns))
+    atlas = np.zeros((rows * tileheight, columns * tilewidth, 4), dtype=np.uint8)
+    for slot, image in enumerate(tiles):
+        if image.get_size() != (tilewidth, tileheight):
+            image = pygame.transform.scale(image, (tilewidth, tileheight))
+        pixels = np.frombuffer(pygame.image.tobytes(image, 'RGBA'), dtype=np.uint8).reshape(tileheight, tilewidth, 4)
+        row, column = divmod(slot, columns)
+        atlas[row * tileheight:(row + 1) * tileheight, column * tilewidth:(column + 1) * tilewidth] = pixels
+    arrays['atlas'] = atlas
+
+    arrays['meta'] = np.array(json.dumps({
+        'version': BUNDLE_VERSION,
+        'digest': digest or source_digest(tmx_path),
+        'width': tmx_data.width,
+        'height': tmx_data.height,
+        'tilewidth': tilewidth,
+        'tileheight': tileheight,
+        'layers': layer_names,
+        'object_layers': object_layer_names,
+        'atlas_columns': columns,
+        'tile_count': len(tiles),
+    }))
+    return arrays
+
+
+def write_bundle(tmx_path, arrays):
+    path = bundle_path(tmx_path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # write to a temp file first so a crash never leaves a half written bundle
+    temp_path = path.with_name(path.name + '.tmp')
+    with open(temp_path, 'wb') as file:
+        np.savez(file, **arrays)
+    temp_path.replace(path)
+    return path
+
+
+def read_bundle(tmx_path, digest):
+    path = bundle_path(tmx_path)
+    if not path.exists():
+        return None
+    try:
+        with np.load(path, allow_pickle=False) as data:
+            arrays = {key: data[key] for key in data.files}
+    except (OSError, ValueError):
+        return None
+    if json.loads(str(arrays['meta'])).get('digest') != digest:
+        return None
+    return arrays
+
+
+def load_bundle(tmx_path, compile=True):
+    """
+    Return the MapBundle for a .tmx, compiling and caching it when the sources changed.
+    With compile False a stale or missing bundle returns None instead.
+    """
+    key = str(Path(tmx_path).resolve())
+    digest = source_digest(tmx_path)
+
+    bundle = _loaded.get(key)
+    if bundle is not None and bundle.digest == digest:
+        return bundle
+
+    arrays = read_bundle(tmx_path, digest)
+    if arrays is None:
+        if not compile:
+            return None
+        arrays = compile_map(tmx_path, digest)
+        try:
+            write_bundle(tmx_path, arrays)
+        except OSError:
+            pass  # read-only install, keep the compiled bundle in memory only
+
+    bundle = MapBundle(arrays)
+    _loaded[key] = bundle
+    return bundle
+
+
+def compile_all(maps_dir='data/maps'):
+    import os
+    import pygame
+
+    # pytmx needs a display mode to convert images, a hidden one is enough
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    pygame.display.init()
+    pygame.display.set_mode((1, 1))
+
+    compiled = []
+    for tmx_path in sorted(Path(maps_dir).glob('**/*.tmx')):
+        path = write_bundle(tmx_path, compile_map(tmx_path))
+        print(f'{tmx_path} -> {path}')
+        compiled.append(path)
+    pygame.display.quit()
+    return compiled
+
+
+if __name__ == '__main__':
+    compile_all(*sys.argv[1:])
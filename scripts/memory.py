@@ -0,0 +1,156 @@
+"""
+Memory accounting.
+
+- tracemalloc snapshots diffed at every state change (opt in with start(), it
+  slows allocation down)
+- live Surface count and bytes by origin, for surfaces created through
+  track_surface()
+- sizes of the long-lived caches registered with track_cache()
+
+report() prints all three. After start() (main.py --memory) the game prints
+a line at every state change; F10 prints the full report at any time.
+"""
+import gc
+import tracemalloc
+import weakref
+
+import pygame
+
+
+def surface_bytes(surface):
+    # subsurfaces share their parent's pixels
+    if surface.get_parent() is not None:
+        return 0
+    return surface.get_pitch() * surface.get_height()
+
+
+def value_size(value):
+    """
+    (surfaces, bytes) held by a cache value, looking into lists, tuples and dicts.
+    """
+    if isinstance(value, pygame.Surface):
+        return 1, surface_bytes(value)
+    if hasattr(value, 'nbytes'):
+        return 0, value.nbytes  # numpy arrays
+    if isinstance(value, dict):
+        value = value.values()
+    elif not isinstance(value, (list, tuple)):
+        return 0, 0
+    surfaces = size = 0
+    for item in value:
+        item_surfaces, item_size = value_size(item)
+        surfaces += item_surfaces
+        size += item_size
+    return surfaces, size
+
+
+class MemoryTracker:
+    def __init__(self, top=10):
+        self.top = top
+        self.enabled = False  # state changes are only recorded after start()
+        self.snapshot = None
+        self.history = []  # (label, traced bytes, live surfaces, surface bytes) per state change
+
+        # origin -> [live surfaces, bytes, surfaces ever created]
+        self.surfaces = {}
+        self.refs = {}  # id(ref) -> (ref, origin, bytes)
+
+        self.caches = {}  # name -> container, or a function returning one
+
+    # tracemalloc
+
+    def start(self, frames=1):
+        self.enabled = True
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+        self.snapshot = tracemalloc.take_snapshot()
+
+    @property
+    def tracing(self):
+        return tracemalloc.is_tracing()
+
+    def transition(self, label, log=print):
+        """
+        Record a state change, diffing Python allocations against the previous one when tracing.
+        Does nothing until start() was called.
+        """
+        if not self.enabled:
+            return
+        # sprites and their groups form cycles, collect them so only real growth shows
+        gc.collect()
+        surfaces, surface_total = self.surface_totals()
+        traced = tracemalloc.get_traced_memory()[0] if self.tracing else 0
+        previous = self.history[-1] if self.history else None
+        self.history.append((label, traced, surfaces, surface_total))
+
+        line = f'memory: {label}  surfaces {surfaces} / {surface_total / 2 ** 20:.2f} MiB'
+        if previous is not None:
+            line += f' ({(surface_total - previous[3]) / 2 ** 20:+.2f})'
+        if self.tracing:
+            line += f'  python {traced / 2 ** 20:.2f} MiB'
+            if previous is not None:
+                line += f' ({(traced - previous[1]) / 2 ** 20:+.2f})'
+        log(line)
+
+        if self.tracing:
+            snapshot = tracemalloc.take_snapshot().filter_traces((
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, '<frozen *>'),
+            ))
+            if self.snapshot is not None:
+                for stat in snapshot.compare_to(self.snapshot, 'lineno')[:self.top]:
+                    log(f'  {stat}')
+            self.snapshot = snapshot
+
+    # surfaces
+
+    def track_surface(self, surface, origin):
+        """
+        Count surface under origin until it is garbage collected. Returns the surface.
+        """
+        size = surface_bytes(surface)
+        counts = self.surfaces.setdefault(origin, [0, 0, 0])
+        counts[0] += 1
+        counts[1] += size
+        counts[2] += 1
+        ref = weakref.ref(surface, self.surface_freed)
+        self.refs[id(ref)] = (ref, origin, size)
+        return surface
+
+    def surface_freed(self, ref):
+        _, origin, size = self.refs.pop(id(ref))
+        counts = self.surfaces[origin]
+        counts[0] -= 1
+        counts[1] -= size
+
+    def surface_totals(self):
+        return sum(counts[0] for counts in self.surfaces.values()), sum(counts[1] for counts in self.surfaces.values())
+
+    # caches
+
+    def track_cache(self, name, container):
+        # container is a dict/list (or a function returning one), weighed whenever a report is made
+        self.caches[name] = container
+
+    def cache_sizes(self):
+        sizes = {}
+        for name, container in self.caches.items():
+            if callable(container):
+                container = container()
+            surfaces, size = value_size(container)
+            sizes[name] = (len(container), surfaces, size)
+        return sizes
+
+    def report(self, log=print):
+        log('live surfaces by origin (live, MiB, created):')
+        for origin, (live, size, created) in sorted(self.surfaces.items(), key=lambda item: -item[1][1]):
+            log(f'  {origin:<24}{live:>6}{size / 2 ** 20:>9.2f}{created:>9}')
+        log('caches (entries, surfaces, MiB):')
+        for name, (entries, surfaces, size) in self.cache_sizes().items():
+            log(f'  {name:<24}{entries:>6}{surfaces:>9}{size / 2 ** 20:>9.2f}')
+        if self.tracing:
+            current, peak = tracemalloc.get_traced_memory()
+            log(f'python allocations {current / 2 ** 20:.2f} MiB, peak {peak / 2 ** 20:.2f} MiB')
+
+
+memory = MemoryTracker()
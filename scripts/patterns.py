@@ -0,0 +1,145 @@
+import math
+import numpy as np
+
+# Boss attacks as data. Rates are volleys per second, angles are degrees.
+#   rate          volleys per second while the attack runs (0 = only fired on demand)
+#   count         bullets per volley
+#   spread        arc covered by the volley, 360 = evenly spaced ring
+#   aim           'player' centres the arc on the player, 'fixed' starts it at angle
+#   angle         base angle for 'fixed' aim
+#   spin          angular velocity of the whole pattern, degrees per second
+#   jitter        random offset applied to the whole volley
+#   bullet_jitter random offset applied to each bullet
+#   predict_chance  chance of an extra shot at where the player is heading
+#   prediction    how far ahead (in player directions) that shot aims
+#   phases        per boss phase overrides of any of the above
+# Rates were converted from the old per-frame fire chances at 60 FPS.
+PATTERNS = {
+    'eye_barrage': {
+        'rate': 15,  # was 25% per frame
+        'count': 1,
+        'spread': 0,
+        'aim': 'player',
+        'jitter': 3,
+        'phases': {
+            2: {'predict_chance': 0.4, 'prediction': 30},
+        },
+    },
+    'hand_sweep': {
+        'rate': 9,  # was 15% per frame
+        'count': 5,
+        'spread': 60,
+        'aim': 'player',
+    },
+    'bullet_hell': {
+        'rate': 7.2,  # was 12% per frame
+        'count': 12,
+        'spread': 360,
+        'aim': 'fixed',
+        'bullet_jitter': 5,
+    },
+    'phase_ring': {
+        'rate': 0,
+        'count': 24,
+        'spread': 360,
+        'aim': 'fixed',
+    },
+    'death_burst': {
+        'rate': 0,
+        'count': 36,
+        'spread': 360,
+        'aim': 'fixed',
+    },
+}
+
+# patterns the boss picks from when attacking
+ATTACK_PATTERNS = ['eye_barrage', 'hand_sweep', 'bullet_hell']
+
+DEFAULTS = {
+    'rate': 0,
+    'count': 1,
+    'spread': 0,
+    'aim': 'fixed',
+    'angle': 0,
+    'spin': 0,
+    'jitter': 0,
+    'bullet_jitter': 0,
+    'predict_chance': 0,
+    'prediction': 0,
+}
+
+
+def direction_table(count, spread):
+    """
+    Angle offsets (radians) of each bullet in a volley, relative to its centre.
+    """
+    if spread >= 360:
+        return np.radians(np.arange(count) * 360 / count)
+    if count == 1:
+        return np.zeros(1)
+    return np.radians(np.linspace(-spread / 2, spread / 2, count))
+
+
+class PatternEmitter:
+    """
+    Fires one pattern on a fixed schedule, independent of the frame rate.
+    Offsets for every phase are computed once; a volley is one rotation of the
+    table and one batched spawn.
+    """
+    def __init__(self, pattern):
+        self.settings = {}
+        self.offsets = {}
+        base = {**DEFAULTS, **{key: value for key, value in pattern.items() if key != 'phases'}}
+        for phase, overrides in {1: {}, **pattern.get('phases', {})}.items():
+            settings = {**base, **overrides}
+            self.settings[phase] = settings
+            self.offsets[phase] = direction_table(settings['count'], settings['spread'])
+        self.reset()
+
+    def reset(self):
+        self.timer = 0
+        self.angle = 0
+
+    def phase_settings(self, phase):
+        # highest defined phase that the boss has reached
+        return max((p for p in self.settings if p <= phase), default=1)
+
+    def update(self, dt, boss):
+        phase = self.phase_settings(boss.phase)
+        settings = self.settings[phase]
+        self.angle += settings['spin'] * dt
+        if settings['rate'] <= 0:
+            return
+        interval = 1 / settings['rate']
+        self.timer += dt
+        while self.timer >= interval:
+            self.timer -= interval
+            self.fire(boss)
+
+    def fire(self, boss):
+        phase = self.phase_settings(boss.phase)
+        settings = self.settings[phase]
+        origin = boss.rect.center
+        target = boss.player.rect.center
+
+        # centre of the volley
+        if settings['aim'] == 'player':
+            center = math.atan2(target[1] - origin[1], target[0] - origin[0])
+        else:
+            center = math.radians(settings['angle'])
+        center += math.radians(self.angle + boss.rng.uniform(-settings['jitter'], settings['jitter']))
+
+        angles = self.offsets[phase] + center
+        if settings['bullet_jitter']:
+            jitter = math.radians(settings['bullet_jitter'])
+            angles = angles + np.array([boss.rng.uniform(-jitter, jitter) for _ in range(len(angles))])
+        boss.spawn_volley(np.column_stack((np.cos(angles), np.sin(angles))))
+
+        # extra shot at where the player is heading
+        if settings['predict_chance'] and boss.rng.random() < settings['predict_chance']:
+            velocity = getattr(boss.player, 'direction', None)
+            if velocity is not None and velocity.length() > 0:
+                predicted_x = target[0] + velocity.x * settings['prediction']
+                predicted_y = target[1] + velocity.y * settings['prediction']
+                angle = math.atan2(predicted_y - origin[1], predicted_x - origin[0])
+                boss.spawn_volley(np.array([[math.cos(angle), math.sin(angle)]]))
@@ -2,33 +2,37 @@ import pygame
 from math import atan2, degrees
 from scripts.AssetLoader import AssetLoader
 from scripts.dodge_roll import DodgeRoll
+from scripts.bullets import SpritePool, projectile_image
+from scripts.audio import audio
+from scripts.simclock import sim_clock
+from scripts.memory import memory
 from os.path import join
 
 class Player(pygame.sprite.Sprite):
-    def __init__(self, pos, groups, collision_sprites, water_sprites, camera):
+    def __init__(self, pos, groups, collision_map, water_map, camera, controls):
+        self.draw_layer = 1  # drawn above player bullets, set before joining groups
         super().__init__(groups)
         
         # load animation frames for player
-        asset_loader = AssetLoader()
+        asset_loader = AssetLoader(self)
         self.idle_side_frames = asset_loader.load_animation("data", "images", "entities", "player", "idle_side")
         self.run_side_frames = asset_loader.load_animation("data", "images", "entities", "player", "run_side")
         self.idle_up_frames = asset_loader.load_animation("data", "images", "entities", "player", "idle_side")  # placeholder for now
         self.run_up_frames = asset_loader.load_animation("data", "images", "entities", "player", "run_up")
         
         self.camera = camera
+        self.controls = controls  # input provider, live devices or scripted
 
-        self.shoot_sound = pygame.mixer.Sound('data/sound/sfx/shoot.wav')
-        self.shoot_sound.set_volume(0.4)
-        self.hurt_sound = pygame.mixer.Sound('data/sound/sfx/hurt.wav')
-        self.hurt_sound.set_volume(1)
+        audio.load('player_shot', 'data/sound/sfx/shoot.wav', volume=0.4, max_voices=2, priority=1)
+        audio.load('player_hurt', 'data/sound/sfx/hurt.wav', volume=1, max_voices=1, priority=3)
 
         # load rifle image
         self.rifle_image = asset_loader.load_image("data", "images", "guns", "rifle.png")
-        self.rifle = self.rifle_image.copy()
+        self.rifle = self.rifle_image  # only ever rotated into new surfaces
 
-        # make flipped versions of side animations
-        self.flipped_run_side_frames = [pygame.transform.flip(f, True, False) for f in self.run_side_frames]
-        self.flipped_idle_side_frames = [pygame.transform.flip(f, True, False) for f in self.idle_side_frames]
+        # flipped versions of side animations, cached by the registry
+        self.flipped_run_side_frames = asset_loader.load_animation("data", "images", "entities", "player", "run_side", variant='flip_x')
+        self.flipped_idle_side_frames = asset_loader.load_animation("data", "images", "entities", "player", "idle_side", variant='flip_x')
 
         # set starting image and rect
         self.image = self.idle_side_frames[0]
@@ -51,8 +55,8 @@ class Player(pygame.sprite.Sprite):
         self.direction = pygame.Vector2()
         self.speed = 100
         self.normal_speed = 100
-        self.collision_sprites = collision_sprites
-        self.water_sprites = water_sprites
+        self.collision_map = collision_map
+        self.water_map = water_map
         self.water_speed = 50
 
         # gun shoot cooldown
@@ -62,7 +66,7 @@ class Player(pygame.sprite.Sprite):
 
         # delay to avoid instant shooting after spawn
         self.entry_delay = 500
-        self.entry_timer = pygame.time.get_ticks()
+        self.entry_timer = sim_clock.get_ticks()
 
         # setup dodge roll
         self.dodge_roll = DodgeRoll(self)
@@ -88,12 +92,12 @@ class Player(pygame.sprite.Sprite):
         self.health -= damage
         
         # Play sound
-        self.hurt_sound.play()
+        audio.play('player_hurt')
 
         # Screenshake
         self.camera.start_screen_shake(duration=10, intensity=5)
         self.invincible = True
-        self.invincibility_timer = pygame.time.get_ticks()
+        self.invincibility_timer = sim_clock.get_ticks()
         
         # Visual feedback
         self.flashing = True
@@ -102,7 +106,7 @@ class Player(pygame.sprite.Sprite):
         return self.health <= 0  # Return True if player is dead
 
     def input(self):
-        keys = pygame.key.get_pressed()
+        keys = self.controls.get_pressed()
 
         # if rolling, skip movement
         if self.dodge_roll.is_rolling:
@@ -126,7 +130,7 @@ class Player(pygame.sprite.Sprite):
 
     def move(self, dt):
         # slow down if in water
-        in_water = any(sprite.rect.colliderect(self.hitbox_rect) for sprite in self.water_sprites)
+        in_water = self.water_map.overlaps(self.hitbox_rect)
         self.speed = self.water_speed if in_water else self.normal_speed
 
         # apply movement and check for collisions
@@ -137,18 +141,19 @@ class Player(pygame.sprite.Sprite):
         self.rect.center = self.hitbox_rect.center
 
     def collision(self, direction):
-        for sprite in self.collision_sprites:
-            if sprite.rect.colliderect(self.hitbox_rect):
+        # re-check each wall, resolving one can push the hitbox off the next
+        for rect in self.collision_map.hits(self.hitbox_rect):
+            if rect.colliderect(self.hitbox_rect):
                 if direction == 'horizontal':
-                    if self.direction.x > 0: self.hitbox_rect.right = sprite.rect.left
-                    if self.direction.x < 0: self.hitbox_rect.left = sprite.rect.right
+                    if self.direction.x > 0: self.hitbox_rect.right = rect.left
+                    if self.direction.x < 0: self.hitbox_rect.left = rect.right
                 else:
-                    if self.direction.y < 0: self.hitbox_rect.top = sprite.rect.bottom
-                    if self.direction.y > 0: self.hitbox_rect.bottom = sprite.rect.top
+                    if self.direction.y < 0: self.hitbox_rect.top = rect.bottom
+                    if self.direction.y > 0: self.hitbox_rect.bottom = rect.top
 
     def update_rifle(self, camera):
         # get mouse pos in screen space
-        mouse_pos = pygame.mouse.get_pos()
+        mouse_pos = self.controls.get_mouse_pos()
 
         # get player center in screen space
         player_screen_pos = camera.apply(self.rect).center
@@ -168,40 +173,47 @@ class Player(pygame.sprite.Sprite):
 
     def gun_timer(self):
         if not self.can_shoot:
-            current_time = pygame.time.get_ticks()
+            current_time = sim_clock.get_ticks()
             if current_time - self.shoot_time >= self.gun_cooldown:
                 self.can_shoot = True
 
     def get_event(self):
-        current_time = pygame.time.get_ticks()
+        current_time = sim_clock.get_ticks()
 
         # wait before player can shoot
         if current_time - self.entry_timer < self.entry_delay:
             return
 
         # left mouse click to shoot
-        if pygame.mouse.get_pressed()[0] and self.can_shoot:
-            bullet = Bullet(self.rifle_tip_world_position, self.shoot_direction, [self.groups()[0], self.bullets])
+        if self.controls.get_mouse_pressed()[0] and self.can_shoot:
+            bullet_pool.acquire(self.rifle_tip_world_position, self.shoot_direction, [self.groups()[0], self.bullets])
             self.camera.start_screen_shake(duration=5, intensity=2)
-            self.shoot_sound.play()
+            audio.play('player_shot')
             self.can_shoot = False
-            self.shoot_time = pygame.time.get_ticks()
+            self.shoot_time = sim_clock.get_ticks()
 
     def draw_rifle(self, surface, camera):
         # rotate rifle image to match mouse direction
         angle = degrees(atan2(self.shoot_direction.x, self.shoot_direction.y)) - 90
         rotated_rifle = pygame.transform.rotate(self.rifle, angle)
 
-        # get screen pos of rifle tip
-        rifle_screen_pos = camera.apply(pygame.Rect(self.rifle_tip_world_position, (0, 0))).topleft
+        # get screen pos of rifle tip, from rect which is at its interpolated position while drawing
+        rifle_tip = pygame.Vector2(self.rect.center) + self.shoot_direction * 15
+        rifle_screen_pos = camera.apply(pygame.Rect(rifle_tip, (0, 0))).topleft
 
         # draw the rifle
         rifle_rect = rotated_rifle.get_rect(center=rifle_screen_pos)
         surface.blit(rotated_rifle, rifle_rect)
 
     def update(self, dt):
+        self.update_input(dt)
+        self.update_movement(dt)
+
+    def update_input(self, dt):
         self.gun_timer()
         self.input()
+
+    def update_movement(self, dt):
         self.dodge_roll.update(dt)
 
         if not self.dodge_roll.is_rolling:
@@ -231,13 +243,10 @@ class Player(pygame.sprite.Sprite):
         if self.time_accumulator >= self.animation_speed:
             self.time_accumulator = 0
             self.current_frame = (self.current_frame + 1) % len(current_frames)
-            
-        # Update bullets
-        self.bullets.update(dt)
         
         # Update invincibility
         if self.invincible:
-            current_time = pygame.time.get_ticks()
+            current_time = sim_clock.get_ticks()
             if current_time - self.invincibility_timer >= self.invincibility_duration:
                 self.invincible = False
                 self.flashing = False
@@ -260,7 +269,7 @@ class Player(pygame.sprite.Sprite):
         # Draw player sprite with flash effect if hit
         if self.flashing and int(self.flash_timer * 15) % 2 == 0:
             # Create a white version of the current frame for the flash effect
-            white_image = self.image.copy()
+            white_image = memory.track_surface(self.image.copy(), 'hit_flash')
             white_image.fill((255, 255, 255), special_flags=pygame.BLEND_RGB_ADD)
             surface.blit(white_image, camera.apply(self.rect))
         else:
@@ -272,15 +281,28 @@ class Player(pygame.sprite.Sprite):
 
 class Bullet(pygame.sprite.Sprite):
     def __init__(self, pos, direction, groups):
-        super().__init__(groups)
-        self.image = pygame.Surface((6, 6))
-        self.image.fill("yellow")
-        self.rect = self.image.get_frect(center=pos)
-        self.spawn_time = pygame.time.get_ticks()
+        super().__init__()
+        self.pool = None
         self.lifetime = 2000
-        self.speed = 400
-        self.velocity = direction * self.speed
+        self.speed = 800  # tuned at 400 while bullets were moved twice per tick
         self.damage = 15  # Damage value for player bullets
+        self.reset(pos, direction, groups)
+
+    def reset(self, pos, direction, groups):
+        # shared image, bullets are recycled through bullet_pool
+        self.image = projectile_image('player')
+        self.rect = self.image.get_frect(center=pos)
+        # interpolate from the muzzle, not from where a recycled bullet last died
+        self.previous_center = self.rect.center
+        self.spawn_time = sim_clock.get_ticks()
+        self.velocity = direction * self.speed
+        self.add(groups)
+
+    def kill(self):
+        was_alive = self.alive()
+        super().kill()
+        if was_alive and self.pool is not None:
+            self.pool.release(self)
 
     def update(self, dt):
         # move the bullet
@@ -288,5 +310,10 @@ class Bullet(pygame.sprite.Sprite):
         self.rect.centerx += movement.x
         self.rect.centery += movement.y
         # remove bullet after sometimes
-        if pygame.time.get_ticks() - self.spawn_time >= self.lifetime:
-            self.kill()
\ No newline at end of file
+        if sim_clock.get_ticks() - self.spawn_time >= self.lifetime:
+            self.kill()
+
+
+# recycles player bullets across shots and restarts
+bullet_pool = SpritePool(Bullet)
+memory.track_cache('player_bullet_pool', bullet_pool.free)
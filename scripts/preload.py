@@ -0,0 +1,125 @@
+"""
+Background asset preloading.
+
+Started at launch, a worker thread decodes the gameplay images (the atlas
+pages when they are packed), sound effects and compiled map bundles while
+Splash and Backstory are on screen. Converting a surface to the display
+format needs the main thread, so decoded images wait in a queue and the game
+loop finishes a few each frame with finalize(). Anything requested before it
+is preloaded simply loads on demand as before.
+"""
+import queue
+import threading
+import time
+
+from scripts.assets import assets
+from scripts.atlas import source_files
+from scripts.audio import audio
+from scripts.mapbundle import load_bundle
+
+IMAGES = ('data/images/menu_back.png',)
+SOUNDS = (
+    'data/sound/sfx/shoot.wav',
+    'data/sound/sfx/hurt.wav',
+    'data/sound/sfx/dodge.wav',
+    'data/sound/sfx/boss_bullet_1.wav',
+)
+MAPS = ('data/maps/0.tmx',)
+
+
+def default_jobs():
+    """
+    (kind, path) for everything the first fight needs.
+    """
+    # packed frames come from their atlas pages, otherwise one job per file
+    images = assets.atlas_pages() or [str(path) for path in source_files()]
+    return ([('image', path) for path in [*images, *IMAGES]] +
+            [('sound', path) for path in SOUNDS] +
+            [('map', path) for path in MAPS])
+
+
+class Preloader:
+    def __init__(self, slice_ms=2):
+        self.slice_ms = slice_ms  # main thread time per frame for finishing images
+        self.jobs = []
+        self.results = queue.Queue()  # (kind, path, decoded image or None, error or None)
+        self.thread = None
+        self.done = 0
+        self.errors = []  # (path, exception), loaded on demand later instead
+        self.started_at = None
+        self.finished_at = None
+
+    def start(self, jobs=None):
+        # audio has to be initialised on the main thread before the worker decodes sounds
+        audio.init()
+        self.jobs = default_jobs() if jobs is None else list(jobs)
+        self.done = 0
+        self.started_at = time.perf_counter()
+        self.finished_at = None
+        self.thread = threading.Thread(target=self.work, name='preloader', daemon=True)
+        self.thread.start()
+
+    def work(self):
+        import pygame
+
+        for kind, path in self.jobs:
+            image = error = None
+            try:
+                if kind == 'image':
+                    image = pygame.image.load(path)
+                elif kind == 'sound':
+                    audio.preload(path)
+                elif kind == 'map':
+                    load_bundle(path, compile=False)  # compiling needs the display, left to the main thread
+            except Exception as e:
+                error = e  # whatever went wrong, the job still counts as done
+            finally:
+                self.results.put((kind, path, image, error))
+
+    @property
+    def active(self):
+        return self.thread is not None and self.done < len(self.jobs)
+
+    @property
+    def progress(self):
+        return self.done / len(self.jobs) if self.jobs else 1.0
+
+    def finalize(self, slice_ms=None):
+        """
+        Convert decoded images on the main thread for up to slice_ms, called once per frame.
+        """
+        if not self.active:
+            return
+        deadline = time.perf_counter() + (self.slice_ms if slice_ms is None else slice_ms) / 1000
+        while time.perf_counter() < deadline:
+            try:
+                kind, path, image, error = self.results.get_nowait()
+            except queue.Empty:
+                break
+            self.done += 1
+            if error is None and image is not None:
+                try:
+                    assets.insert(path, image)
+                except Exception as e:
+                    error = e
+            if error is not None:
+                self.errors.append((path, error))
+        if self.done == len(self.jobs):
+            self.finished_at = time.perf_counter()
+
+    def wait(self):
+        # block until everything is preloaded, for tools and tests
+        while self.active:
+            self.finalize(slice_ms=float('inf'))
+            time.sleep(0.001)
+
+    def stats(self):
+        return {
+            'jobs': len(self.jobs),
+            'done': self.done,
+            'errors': len(self.errors),
+            'seconds': (self.finished_at - self.started_at) if self.finished_at is not None else None,
+        }
+
+
+preloader = Preloader()
@@ -0,0 +1,144 @@
+import time
+from contextlib import contextmanager
+
+import numpy as np
+import pygame
+
+from scripts.settings import FPS
+
+FRAME_BUDGET_MS = 1000 / FPS
+
+# top level phases add up to the frame, nested ones are the scheduler's phases inside 'update'.
+# 'idle' is the time clock.tick() waits, everything else is work against the budget
+PHASES = ('idle', 'events', 'update', 'input', 'ai', 'movement', 'projectiles', 'collision', 'camera', 'draw', 'display')
+TOP_LEVEL = ('idle', 'events', 'update', 'draw', 'display')
+WORK = ('events', 'update', 'draw', 'display')
+COUNTS = ('sprites', 'boss_bullets', 'player_bullets', 'steps')
+
+
+class FrameProfiler:
+    """
+    Per-frame phase timings (ms) and entity counts kept in a fixed-size ring buffer.
+    The loop marks frames with begin_frame()/end_frame() and code wraps its work
+    in phase(name); a phase entered several times in a frame (one per simulation
+    step) adds up.
+    """
+    def __init__(self, size=600):
+        self.size = size
+        self.phase_index = {name: index for index, name in enumerate(PHASES)}
+        self.count_index = {name: index for index, name in enumerate(COUNTS)}
+        self.work = [self.phase_index[name] for name in WORK]
+
+        self.times = np.zeros((size, len(PHASES)))
+        self.counts = np.zeros((size, len(COUNTS)), dtype=np.int64)
+        self.totals = np.zeros(size)  # work per frame
+        self.frames = 0  # frames recorded so far, the next one goes to frames % size
+
+        self.current = np.zeros(len(PHASES))
+        self.current_counts = np.zeros(len(COUNTS), dtype=np.int64)
+        self.show_overlay = False
+
+    def begin_frame(self):
+        self.current[:] = 0
+        self.current_counts[:] = 0
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, (time.perf_counter() - start) * 1000)
+
+    def add_time(self, name, ms):
+        self.current[self.phase_index[name]] += ms
+
+    def count(self, name, value):
+        self.current_counts[self.count_index[name]] = value
+
+    def end_frame(self):
+        slot = self.frames % self.size
+        self.times[slot] = self.current
+        self.counts[slot] = self.current_counts
+        self.totals[slot] = self.current[self.work].sum()
+        self.frames += 1
+
+    def toggle_overlay(self):
+        self.show_overlay = not self.show_overlay
+
+    # metrics API
+
+    def recent(self, frames=None):
+        """
+        The last frames (default all kept) as (times, counts, totals), oldest first.
+        times columns follow PHASES and counts columns follow COUNTS.
+        """
+        kept = min(self.frames, self.size)
+        frames = kept if frames is None else min(frames, kept)
+        slots = (np.arange(self.frames - frames, self.frames)) % self.size
+        return self.times[slots], self.counts[slots], self.totals[slots]
+
+    def stats(self, frames=None):
+        """
+        {phase: {'last', 'mean', 'p50', 'p99', 'max'}} in ms, with the frame's work
+        (idle excluded) under 'work' and the latest entity counts under 'counts'.
+        """
+        times, counts, totals = self.recent(frames)
+        if not len(totals):
+            return {}
+        columns = {name: times[:, index] for name, index in self.phase_index.items()}
+        columns['work'] = totals
+        stats = {}
+        for name, values in columns.items():
+            stats[name] = {
+                'last': float(values[-1]),
+                'mean': float(values.mean()),
+                'p50': float(np.percentile(values, 50)),
+                'p99': float(np.percentile(values, 99)),
+                'max': float(values.max()),
+            }
+        stats['counts'] = {name: int(counts[-1, index]) for name, index in self.count_index.items()}
+        return stats
+
+    def over_budget(self, budget_ms=FRAME_BUDGET_MS, frames=None):
+        # fraction of frames whose work took longer than the budget
+        _, _, totals = self.recent(frames)
+        return float((totals > budget_ms).mean()) if len(totals) else 0.0
+
+    def draw_overlay(self, surface, font, budget_ms=FRAME_BUDGET_MS, graph_frames=120):
+        stats = self.stats()
+        if not stats:
+            return
+        lines = [f'{"phase":<14}{"p50":>6}{"p99":>6}']
+        for name in ('work',) + PHASES:
+            indent = '  ' if name not in TOP_LEVEL and name != 'work' else ''
+            lines.append(f'{indent + name:<14}{stats[name]["p50"]:6.2f}{stats[name]["p99"]:6.2f}')
+        counts = stats['counts']
+        lines.append(f'sprites {counts["sprites"]}  bullets {counts["boss_bullets"]}+{counts["player_bullets"]}')
+
+        line_height = font.get_linesize()
+        graph_height = 30
+        width = max(font.size(line)[0] for line in lines) + 8
+        height = line_height * len(lines) + graph_height + 12
+        panel = pygame.Surface((width, height), pygame.SRCALPHA)
+        panel.fill((0, 0, 0, 170))
+        for row, line in enumerate(lines):
+            panel.blit(font.render(line, False, (255, 255, 255)), (4, 4 + row * line_height))
+
+        # frame work graph, the line marks the budget at two thirds of the height
+        _, _, totals = self.recent(graph_frames)
+        graph_top = height - graph_height - 4
+        scale = graph_height * 2 / 3 / budget_ms
+        bar_width = max(1, (width - 8) // graph_frames)
+        for index, total in enumerate(totals.tolist()):
+            bar = min(graph_height, max(1, int(total * scale)))
+            color = (255, 60, 60) if total > budget_ms else (80, 220, 80)
+            x = 4 + index * bar_width
+            pygame.draw.rect(panel, color, (x, graph_top + graph_height - bar, bar_width, bar))
+        budget_y = graph_top + graph_height - int(budget_ms * scale)
+        pygame.draw.line(panel, (255, 255, 0), (4, budget_y), (width - 4, budget_y))
+
+        surface.blit(panel, (surface.get_width() - width - 4, 4))
+
+
+frame_profiler = FrameProfiler()
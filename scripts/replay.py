@@ -0,0 +1,183 @@
+"""
+Input recordings.
+
+A recording is the run's seed plus the input of every simulation tick, which
+is all a fight depends on: replaying it reproduces the fight exactly.
+
+File layout, little endian:
+    header  magic b'KWAG', version u8, sim rate u16, seed u64
+    runs    varint ticks, flags u8, zigzag varint dx, zigzag varint dy
+
+Each run is one input held for that many ticks. flags packs the tracked keys
+and mouse buttons, dx/dy are the mouse position change from the previous run,
+so a held input costs a few bytes however long it lasts.
+"""
+import argparse
+import struct
+import pygame
+from scripts.inputs import InputProvider, InputFrame
+
+MAGIC = b'KWAG'
+VERSION = 1
+HEADER = struct.Struct('<4sBHQ')
+SEED_MAX = 2 ** 64 - 1  # the header stores the seed as u64
+
+# the only keys gameplay reads, one flag bit each, then one bit per mouse button
+TRACKED_KEYS = (pygame.K_w, pygame.K_a, pygame.K_s, pygame.K_d, pygame.K_LSHIFT)
+BUTTON_SHIFT = len(TRACKED_KEYS)
+
+
+def seed_arg(text):
+    """
+    argparse type for --seed, only seeds a recording can store are accepted.
+    """
+    seed = int(text)
+    if not 0 <= seed <= SEED_MAX:
+        raise argparse.ArgumentTypeError(f'seed must be between 0 and {SEED_MAX}')
+    return seed
+
+
+def encode_frame(frame):
+    flags = 0
+    for bit, key in enumerate(TRACKED_KEYS):
+        if frame.keys[key]:
+            flags |= 1 << bit
+    for bit, pressed in enumerate(frame.buttons[:3]):
+        if pressed:
+            flags |= 1 << (BUTTON_SHIFT + bit)
+    x, y = frame.mouse_pos
+    return flags, int(x), int(y)
+
+
+def decode_frame(flags, x, y):
+    keys = [key for bit, key in enumerate(TRACKED_KEYS) if flags & (1 << bit)]
+    buttons = [bool(flags & (1 << (BUTTON_SHIFT + bit))) for bit in range(3)]
+    return InputFrame(keys, buttons, (x, y))
+
+
+def write_varint(file, value):
+    while True:
+        byte = value & 0x7f
+        value >>= 7
+        if value:
+            file.write(bytes((byte | 0x80,)))
+        else:
+            file.write(bytes((byte,)))
+            return
+
+
+def read_varint(file):
+    value = shift = 0
+    while True:
+        byte = file.read(1)
+        if not byte:
+            raise EOFError
+        value |= (byte[0] & 0x7f) << shift
+        if byte[0] < 0x80:
+            return value
+        shift += 7
+
+
+def zigzag(value):
+    return value * 2 if value >= 0 else -value * 2 - 1
+
+
+def unzigzag(value):
+    return value // 2 if not value & 1 else -(value + 1) // 2
+
+
+class InputRecorder(InputProvider):
+    """
+    Passes another provider's input through while streaming it to path.
+    Every fight started on it (re)writes the file.
+    """
+    def __init__(self, provider, path):
+        super().__init__()
+        self.provider = provider
+        self.path = path
+        self.file = None
+
+    @property
+    def seed(self):
+        return self.provider.seed
+
+    def start(self, seed, sim_hz):
+        self.close()
+        self.provider.start(seed, sim_hz)
+        self.file = open(self.path, 'wb')
+        self.file.write(HEADER.pack(MAGIC, VERSION, sim_hz, seed))
+        self.run = None  # (flags, x, y) being held
+        self.run_ticks = 0
+        self.last_pos = (0, 0)
+
+    def poll(self, state):
+        self.provider.poll(state)
+        self.frame = self.provider.frame
+        if self.file is None:
+            return
+        encoded = encode_frame(self.frame)
+        if encoded == self.run:
+            self.run_ticks += 1
+            return
+        self.write_run()
+        self.run = encoded
+        self.run_ticks = 1
+
+    def write_run(self):
+        if not self.run_ticks:
+            return
+        flags, x, y = self.run
+        write_varint(self.file, self.run_ticks)
+        self.file.write(bytes((flags,)))
+        write_varint(self.file, zigzag(x - self.last_pos[0]))
+        write_varint(self.file, zigzag(y - self.last_pos[1]))
+        self.last_pos = (x, y)
+
+    def close(self):
+        if self.file is not None:
+            self.write_run()
+            self.file.close()
+            self.file = None
+
+
+class ReplayInput(InputProvider):
+    """
+    Plays a recording back tick by tick, then holds no input.
+    seed is the recorded run's seed, gameplay uses it instead of its own.
+    """
+    def __init__(self, path):
+        super().__init__()
+        self.path = path
+        self.runs = []  # (ticks, frame)
+        with open(path, 'rb') as file:
+            magic, version, self.sim_hz, self.seed = HEADER.unpack(file.read(HEADER.size))
+            if magic != MAGIC or version != VERSION:
+                raise ValueError(f'{path} is not a version {VERSION} input recording')
+            x = y = 0
+            while True:
+                try:
+                    ticks = read_varint(file)
+                    flags = file.read(1)[0]
+                    x += unzigzag(read_varint(file))
+                    y += unzigzag(read_varint(file))
+                except (EOFError, IndexError):
+                    break  # end of file, or a recording cut off mid run
+                self.runs.append((ticks, decode_frame(flags, x, y)))
+        self.ticks = sum(ticks for ticks, _ in self.runs)
+
+    def start(self, seed, sim_hz):
+        if sim_hz != self.sim_hz:
+            raise ValueError(f'{self.path} was recorded at {self.sim_hz} Hz, the simulation runs at {sim_hz} Hz')
+        self.run_index = 0
+        self.run_left = self.runs[0][0] if self.runs else 0
+
+    def poll(self, state):
+        if self.run_index >= len(self.runs):
+            self.frame = InputFrame()
+            return
+        self.frame = self.runs[self.run_index][1]
+        self.run_left -= 1
+        if not self.run_left:
+            self.run_index += 1
+            if self.run_index < len(self.runs):
+                self.run_left = self.runs[self.run_index][0]
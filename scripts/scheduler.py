@@ -0,0 +1,70 @@
+import time
+
+from scripts.profiler import frame_profiler
+
+# update order within one simulation step
+PHASES = ('input', 'ai', 'movement', 'projectiles', 'collision', 'camera')
+
+
+class EntityScheduler:
+    """
+    Runs every registered entity once per step, phase by phase in PHASES order.
+    An entity is registered once with the callables for the phases it takes
+    part in; registering it again is an error, so nothing can tick twice.
+    timings holds each phase's time (ms) in the last step and counts how many
+    entities run in it; both also feed the frame profiler.
+    """
+    def __init__(self, phases=PHASES):
+        self.phases = phases
+        self.entries = {phase: [] for phase in phases}  # phase -> [(entity, update)]
+        self.entities = {}  # id(entity) -> entity
+        self.timings = dict.fromkeys(phases, 0.0)
+        self.counts = dict.fromkeys(phases, 0)
+        self.steps = 0
+
+    def __len__(self):
+        return len(self.entities)
+
+    def __contains__(self, entity):
+        return id(entity) in self.entities
+
+    def register(self, entity, **updates):
+        """
+        register(player, input=player.update_input, movement=player.update_movement)
+        """
+        if entity in self:
+            raise ValueError(f'{entity!r} is already scheduled')
+        unknown = set(updates) - set(self.phases)
+        if unknown:
+            raise ValueError(f'unknown phases {sorted(unknown)}, expected {self.phases}')
+        self.entities[id(entity)] = entity
+        for phase, update in updates.items():
+            self.entries[phase].append((entity, update))
+            self.counts[phase] += 1
+        return entity
+
+    def unregister(self, entity):
+        if self.entities.pop(id(entity), None) is None:
+            return
+        for phase, entries in self.entries.items():
+            self.entries[phase] = [entry for entry in entries if entry[0] is not entity]
+            self.counts[phase] = len(self.entries[phase])
+
+    def clear(self):
+        self.entities.clear()
+        for phase in self.phases:
+            self.entries[phase] = []
+            self.counts[phase] = 0
+
+    def run(self, dt):
+        for phase in self.phases:
+            start = time.perf_counter()
+            for _, update in self.entries[phase]:
+                update(dt)
+            elapsed = (time.perf_counter() - start) * 1000
+            self.timings[phase] = elapsed
+            frame_profiler.add_time(phase, elapsed)
+        self.steps += 1
+
+    def stats(self):
+        return {phase: {'ms': self.timings[phase], 'entities': self.counts[phase]} for phase in self.phases}
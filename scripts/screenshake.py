@@ -1,18 +1,27 @@
 import random
 
 class ScreenShake:
-    def __init__(self):
-        self.duration = 0
+    def __init__(self, rng=None, shake_rate=60):
+        self.rng = rng or random.Random()
+        self.duration = 0  # seconds left
         self.intensity = 5
+        # a new offset is rolled shake_rate times per second, whatever the tick rate
+        self.interval = 1 / shake_rate
+        self.timer = 0
 
     def start(self, duration, intensity=5):
-        self.duration = duration
+        # duration is in 60 FPS frames
+        self.duration = duration / 60
         self.intensity = intensity
+        self.timer = 0
 
-    def update(self):
+    def update(self, dt):
         if self.duration > 0:
-            self.duration -= 1
-            offset_x = random.randint(-self.intensity, self.intensity)
-            offset_y = random.randint(-self.intensity, self.intensity)
-            return offset_x, offset_y
-        return 0, 0
\ No newline at end of file
+            self.duration -= dt
+            self.timer -= dt
+            if self.timer <= 0:
+                self.timer += self.interval
+                offset_x = self.rng.randint(-self.intensity, self.intensity)
+                offset_y = self.rng.randint(-self.intensity, self.intensity)
+                return offset_x, offset_y
+        return 0, 0
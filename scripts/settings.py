@@ -1,3 +1,8 @@
 WIDTH, HEIGHT = 400, 224
 TILE_SIZE = 16
 FPS = 60
+# fixed simulation rate, rendering interpolates between steps
+SIM_HZ = 120
+MAX_SUBSTEPS = 5  # steps per frame before the simulation falls behind instead
+CHUNK_SIZE = 256
+ASSET_BUDGET = 64 * 2 ** 20  # bytes of decoded images the asset registry keeps
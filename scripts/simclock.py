@@ -0,0 +1,73 @@
+from scripts.settings import SIM_HZ, MAX_SUBSTEPS
+
+MIN_TIME_SCALE = 0.1
+MAX_TIME_SCALE = 16
+
+
+class SimClock:
+    """
+    The world clock. The game loop feeds it real frame time and runs the fixed
+    simulation steps it hands out; everything in the simulation takes time from
+    it instead of pygame.time.get_ticks(), so pausing, slow motion, fast forward
+    and headless runs all keep the same timings.
+    """
+    def __init__(self, sim_hz=SIM_HZ):
+        self.step = 1 / sim_hz
+        self.time_scale = 1.0
+        self.reset()
+
+    def reset(self):
+        self.tick = 0
+        self.time = 0.0  # seconds
+        self.accumulator = 0.0
+        # the debug pause (F5) and a state's pause menu freeze the world independently
+        self.debug_paused = False
+        self.menu_paused = False
+        self.pending_steps = 0  # single steps requested while debug paused
+
+    def set_time_scale(self, scale):
+        self.time_scale = max(MIN_TIME_SCALE, min(scale, MAX_TIME_SCALE))
+
+    @property
+    def paused(self):
+        return self.debug_paused or self.menu_paused
+
+    def toggle_pause(self):
+        self.debug_paused = not self.debug_paused
+
+    def step_once(self):
+        # advance exactly one tick on the next frame, only while debug paused with no pause menu open
+        if self.debug_paused and not self.menu_paused:
+            self.pending_steps += 1
+
+    def frame(self, frame_time):
+        """
+        Number of simulation steps to run for frame_time seconds of real time.
+        Catch up is bounded, past that the simulation runs slow instead of piling up steps.
+        """
+        if self.menu_paused:
+            return 0
+        if self.debug_paused:
+            steps, self.pending_steps = self.pending_steps, 0
+            return steps
+        max_steps = MAX_SUBSTEPS * max(1, self.time_scale)
+        self.accumulator = min(self.accumulator + frame_time * self.time_scale, self.step * max_steps)
+        steps = int(self.accumulator / self.step)
+        self.accumulator -= steps * self.step
+        return steps
+
+    @property
+    def alpha(self):
+        # how far rendering is between the last two steps, frozen frames show the exact state
+        return 1.0 if self.paused else self.accumulator / self.step
+
+    def advance(self, dt):
+        self.tick += 1
+        self.time += dt
+
+    def get_ticks(self):
+        # milliseconds, drop-in for pygame.time.get_ticks()
+        return int(self.time * 1000)
+
+
+sim_clock = SimClock()
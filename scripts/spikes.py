@@ -0,0 +1,163 @@
+"""
+Spike captures.
+
+When armed, every frame runs under cProfile and any frame whose work goes over
+the budget is written to disk: its call profile as .prof (pstats, snakeviz)
+and .speedscope.json (https://www.speedscope.app), plus the phase timings of
+the frames around it as .frames.json. A capture can also be forced for the
+next frame, armed or not. Captures are written once the frames after them are
+in; flush() writes the ones still waiting, e.g. when the game quits.
+"""
+import cProfile
+import json
+import os
+import pstats
+
+from scripts.profiler import frame_profiler, FRAME_BUDGET_MS, PHASES, COUNTS
+
+
+class SpikeCapture:
+    def __init__(self, profiler, out_dir='profiles', budget_ms=FRAME_BUDGET_MS, context_frames=30, cooldown_frames=120):
+        self.profiler = profiler
+        self.out_dir = out_dir
+        self.budget_ms = budget_ms
+        self.context_frames = context_frames  # frames of phase timings kept on each side
+        self.cooldown_frames = cooldown_frames  # frames to skip after a capture, one hitch is one capture
+        self.armed = False
+        self.forced = False
+
+        self.profile = None
+        self.pending = []  # (frame, work ms, profile) waiting for the frames after them, oldest first
+        self.next_capture = 0
+        self.captures = []  # paths of the written .prof files
+
+    def arm(self, budget_ms=None):
+        if budget_ms is not None:
+            self.budget_ms = budget_ms
+        self.armed = True
+
+    def force(self):
+        # capture the next frame whatever it costs
+        self.forced = True
+
+    def begin_frame(self):
+        if self.armed or self.forced:
+            self.profile = cProfile.Profile()
+            self.profile.enable()
+
+    def end_frame(self):
+        """
+        Call after the profiler's end_frame(), so the frame's work is recorded.
+        """
+        frame = self.profiler.frames - 1
+        if self.profile is not None:
+            self.profile.disable()
+            work = float(self.profiler.totals[frame % self.profiler.size])
+            spike = self.armed and work > self.budget_ms and frame >= self.next_capture
+            if spike or self.forced:
+                self.pending.append((frame, work, self.profile))
+                self.next_capture = frame + self.cooldown_frames
+            self.forced = False
+            self.profile = None
+
+        # the frames after a capture are in, write it out
+        while self.pending and frame - self.pending[0][0] >= self.context_frames:
+            self.write(*self.pending.pop(0))
+
+    def flush(self):
+        # write every waiting capture with the frames recorded so far
+        while self.pending:
+            self.write(*self.pending.pop(0))
+
+    def write(self, frame, work, profile):
+        os.makedirs(self.out_dir, exist_ok=True)
+        base = os.path.join(self.out_dir, f'spike-{frame:06d}-{work:.1f}ms')
+
+        profile.dump_stats(base + '.prof')
+        stats = pstats.Stats(profile)
+        with open(base + '.speedscope.json', 'w') as file:
+            json.dump(speedscope_profile(stats, f'frame {frame} ({work:.1f} ms)'), file)
+
+        # phase timings from context_frames before to context_frames after
+        kept = min(self.profiler.frames, self.profiler.size)
+        first = max(frame - self.context_frames, self.profiler.frames - kept)
+        last = min(frame + self.context_frames + 1, self.profiler.frames)
+        frames = []
+        for index in range(first, last):
+            slot = index % self.profiler.size
+            frames.append({
+                'frame': index,
+                'work_ms': float(self.profiler.totals[slot]),
+                'phases_ms': dict(zip(PHASES, self.profiler.times[slot].tolist())),
+                'counts': dict(zip(COUNTS, self.profiler.counts[slot].tolist())),
+            })
+        with open(base + '.frames.json', 'w') as file:
+            json.dump({'spike_frame': frame, 'budget_ms': self.budget_ms, 'frames': frames}, file, indent=1)
+
+        self.captures.append(base + '.prof')
+        print(f'spike capture: {base}.prof')
+
+
+def speedscope_profile(stats, name, max_depth=64, min_fraction=1e-4):
+    """
+    Convert pstats into a speedscope sampled profile (weights in ms).
+    cProfile only keeps caller -> callee totals, so stacks are rebuilt by
+    splitting each function's time between its callers in proportion to
+    what each caller spent in it.
+    """
+    entries = stats.stats  # func -> (cc, nc, tt, ct, callers)
+    frames = []
+    frame_index = {}
+
+    def frame_of(func):
+        if func not in frame_index:
+            filename, line, function = func
+            frame_index[func] = len(frames)
+            frames.append({'name': function, 'file': filename, 'line': line})
+        return frame_index[func]
+
+    # callee lists, with the time each callee spent when called from func
+    callees = {}
+    for func, (_, _, _, _, callers) in entries.items():
+        for caller, (_, _, _, caller_ct) in callers.items():
+            callees.setdefault(caller, []).append((func, caller_ct))
+
+    samples = []
+    weights = []
+    roots = [func for func, entry in entries.items() if not entry[4]]
+    total = sum(entries[func][3] for func in roots) or 1
+
+    def walk(func, inclusive, stack):
+        _, _, tt, ct, _ = entries[func]
+        stack = stack + [frame_of(func)]
+        if ct > 0 and inclusive * tt / ct > 0:
+            samples.append(stack)
+            weights.append(inclusive * tt / ct * 1000)
+        if len(stack) >= max_depth:
+            return
+        for callee, callee_ct in callees.get(func, ()):
+            share = inclusive * callee_ct / ct if ct else 0
+            if share / total >= min_fraction and frame_index.get(callee) not in stack:
+                walk(callee, share, stack)
+
+    for root in roots:
+        walk(root, entries[root][3], [])
+
+    return {
+        '$schema': 'https://www.speedscope.app/file-format-schema.json',
+        'name': name,
+        'exporter': 'knight-with-a-gun spike capture',
+        'shared': {'frames': frames},
+        'profiles': [{
+            'type': 'sampled',
+            'name': name,
+            'unit': 'milliseconds',
+            'startValue': 0,
+            'endValue': sum(weights),
+            'samples': samples,
+            'weights': weights,
+        }],
+    }
+
+
+spike_capture = SpikeCapture(frame_profiler)
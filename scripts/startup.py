@@ -0,0 +1,65 @@
+"""
+Startup tracing.
+
+main.py imports this first and wraps every step of the cold start (imports,
+pygame.init, display creation, each state built) in a span. The game loop
+marks the first presented frame; time-to-first-frame is measured from the
+moment this module was imported. Spans recorded later (states built on
+demand or prewarmed) are kept too and show up after the first frame line.
+"""
+import time
+from contextlib import contextmanager
+
+_origin = time.perf_counter()
+
+
+class StartupTrace:
+    def __init__(self, origin=_origin):
+        self.origin = origin
+        self.spans = []  # (label, start ms, duration ms), start relative to origin
+        self.depth = 0
+        self.first_frame = None  # ms after origin
+        self.report_on_first_frame = False
+
+    def now(self):
+        return (time.perf_counter() - self.origin) * 1000
+
+    @contextmanager
+    def span(self, label):
+        start = self.now()
+        index = len(self.spans)
+        self.spans.append(None)  # keep nested spans after their parent
+        self.depth += 1
+        try:
+            yield
+        finally:
+            self.depth -= 1
+            self.spans[index] = ('  ' * self.depth + label, start, self.now() - start)
+
+    def frame_presented(self, log=print):
+        if self.first_frame is not None:
+            return
+        self.first_frame = self.now()
+        if self.report_on_first_frame:
+            self.report(log)
+
+    def report(self, log=print):
+        log('startup (start ms, took ms):')
+        frame_logged = False
+        for span in self.spans:
+            if span is None:
+                continue  # still running
+            label, start, duration = span
+            if not frame_logged and self.first_frame is not None and start >= self.first_frame:
+                log(f'  {"first frame":<32}{self.first_frame:>9.1f}')
+                frame_logged = True
+            log(f'  {label:<32}{start:>9.1f}{duration:>9.1f}')
+        if self.first_frame is None:
+            log('  no frame presented yet')
+        elif not frame_logged:
+            log(f'  {"first frame":<32}{self.first_frame:>9.1f}')
+        if self.first_frame is not None:
+            log(f'time to first frame {self.first_frame:.1f} ms')
+
+
+startup_trace = StartupTrace()
@@ -1,9 +1,22 @@
 import pygame
 import os
+from functools import lru_cache
+
+
+# every state shares one copy of these instead of loading its own
+@lru_cache(maxsize=None)
+def load_sound(path):
+    return pygame.mixer.Sound(path)
+
+
+@lru_cache(maxsize=None)
+def load_font(path, size):
+    return pygame.font.Font(path, size)
+
 
 class BaseState:
     def __init__(self):
-        self.choosing_sound = pygame.mixer.Sound('data/sound/sfx/choosing.wav')
+        self.choosing_sound = load_sound('data/sound/sfx/choosing.wav')
         self.choosing_sound.set_volume(1)
         self.font_path = 'data/homespun.ttf'
         self.background_path = 'data/images/menu_back.png'
@@ -12,7 +25,9 @@ class BaseState:
         self.next_state = None
         self.screen_rect = pygame.display.get_surface().get_rect()
         self.persist = {}
-        self.font = pygame.font.Font(self.font_path, 24)
+        self.font = load_font(self.font_path, 24)
+        # how far the frame being drawn is between the last two simulation steps
+        self.interpolation = 1.0
 
     def startup(self, persistent):
         self.persist = persistent
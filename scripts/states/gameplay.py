@@ -1,12 +1,21 @@
 import pygame
+import random
 import sys
-from .base import BaseState
+from .base import BaseState, load_font
 from scripts.player import Player
 from scripts.settings import *
 from scripts.tilemap import TileMap
 from os.path import join
 from scripts.AssetLoader import custom_cursor
 from scripts.camera import Camera
+from scripts.culling import SpatialIndex, IndexedGroup
+from scripts.collision import SpatialHash
+from scripts.inputs import DeviceInput
+from scripts.simclock import sim_clock
+from scripts.audio import audio
+from scripts.profiler import frame_profiler
+from scripts.scheduler import EntityScheduler
+from scripts.memory import memory
 from scripts.test_boss_v6 import Boss  
 
 class Gameplay(BaseState):
@@ -15,11 +24,26 @@ class Gameplay(BaseState):
         self.next_state = "GAME_OVER"
         self.persist = {"victory": False, "restart": False}
         
-        # Sprite Group
-        self.all_sprites = pygame.sprite.Group()
-        self.collision_sprites = pygame.sprite.Group()
-        self.water_sprites = pygame.sprite.Group()
+        # Sprite Group, drawable sprites are tracked by a spatial index for culling
+        self.sprite_index = SpatialIndex()
+        self.all_sprites = IndexedGroup(self.sprite_index)
         self.bullets = pygame.sprite.Group() 
+
+        # Ticks every entity once per step in a fixed phase order
+        self.scheduler = EntityScheduler()
+
+        # Broadphase for projectile hits, refilled every tick
+        self.enemy_hash = SpatialHash()
+        self.player_hash = SpatialHash()
+
+        # Where player input comes from, swapped for a scripted provider when headless
+        self.controls = DeviceInput()
+
+        # Every random gameplay decision comes from this, seeded per fight.
+        # seed None picks a fresh one, the fight's seed is kept in run_seed
+        self.seed = None
+        self.run_seed = None
+        self.rng = random.Random()
         
         # Game state
         self.paused = False
@@ -33,13 +57,11 @@ class Gameplay(BaseState):
         # Transition effect variables
         self.transitioning = False
         self.transition_alpha = 0
-        self.transition_speed = 5  # How fast the transition occurs
+        self.transition_speed = 300  # How fast the transition occurs, alpha per second
         
     def startup(self, persistent):
         # Background music
-        pygame.mixer.music.load('data/sound/music/bg_music.wav')
-        pygame.mixer.music.set_volume(0.4)
-        pygame.mixer.music.play(-1)
+        audio.play_music('data/sound/music/bg_music.wav', volume=0.4)
         
         self.persist = persistent
         
@@ -48,12 +70,11 @@ class Gameplay(BaseState):
         self.done = False
 
         # Initialize UI font
-        self.ui_font = pygame.font.Font(self.font_path, 20)
+        self.ui_font = load_font(self.font_path, 20)
         
         # Clear any existing sprites
         self.all_sprites.empty()
-        self.collision_sprites.empty()
-        self.water_sprites.empty()
+        self.sprite_index.clear()
         self.bullets.empty()
         
         # Reset game state
@@ -65,19 +86,27 @@ class Gameplay(BaseState):
         self.transitioning = False
         self.transition_alpha = 0
 
+        # Gameplay timers start from zero every fight
+        sim_clock.reset()
+
+        # Seed the fight, a replay brings its own seed
+        if self.controls.seed is not None:
+            self.run_seed = self.controls.seed
+        elif self.seed is not None:
+            self.run_seed = self.seed
+        else:
+            self.run_seed = random.getrandbits(63)
+        self.rng.seed(self.run_seed)
+        self.controls.start(self.run_seed, SIM_HZ)
+
         # load map
-        self.tilemap = TileMap(filename='data/maps/0.tmx',
-                               all_sprites=self.all_sprites,
-                               collision_sprites=self.collision_sprites,
-                               water_sprites=self.water_sprites)
-        
-        map_width = self.tilemap.tmx_data.tilewidth * self.tilemap.tmx_data.width
-        map_height = self.tilemap.tmx_data.tileheight * self.tilemap.tmx_data.height
-        self.camera = Camera(WIDTH, HEIGHT, map_width, map_height)
+        self.tilemap = TileMap(filename='data/maps/0.tmx')
+        
+        self.camera = Camera(WIDTH, HEIGHT, self.tilemap.width, self.tilemap.height, self.controls, self.rng)
 
         # Player
         spawn_pos = self.tilemap.get_entity_pos('player')
-        self.player = Player(spawn_pos, [self.all_sprites], self.collision_sprites, self.water_sprites, self.camera)
+        self.player = Player(spawn_pos, [self.all_sprites], self.tilemap.collision_map, self.tilemap.water_map, self.camera, self.controls)
         
         # Force camera to player position at start
         self.camera.update(self.player.rect)
@@ -88,16 +117,28 @@ class Gameplay(BaseState):
             boss_pos = (WIDTH/2, HEIGHT/1.2)
             
         # Create boss instance
-        self.boss = Boss(boss_pos, [self.all_sprites], self.collision_sprites, self.player)
+        self.boss = Boss(boss_pos, [self.all_sprites], self.tilemap.collision_map, self.player, self.rng)
         
         # Game state variables
         self.boss_defeated = False
         self.game_over = False
+
+        # Bin the freshly spawned sprites so the first frame can be culled
+        self.sprite_index.update()
+
+        # One entry per entity, in update order: input -> ai -> movement -> projectiles -> collision -> camera
+        self.scheduler.clear()
+        self.scheduler.register(self.player, input=self.player.update_input, movement=self.player.update_movement)
+        self.scheduler.register(self.boss, ai=self.boss.update)
+        self.scheduler.register(self.player.bullets, projectiles=self.player.bullets.update)
+        self.scheduler.register(self.boss.bullets, projectiles=self.boss.bullets.update)
+        self.scheduler.register(self, collision=lambda dt: self.check_collisions(), camera=self.update_camera)
         
 
     def get_event(self, event):
         if event.type == pygame.QUIT:
             self.quit = True
+            self.controls.close()
         
         if self.paused:
             # Handle pause menu input
@@ -111,30 +152,61 @@ class Gameplay(BaseState):
         
     def toggle_pause(self):
         self.paused = not self.paused
+        # the pause menu freezes the whole world, not just this state
+        sim_clock.menu_paused = self.paused
         # Reset selected option when opening pause menu
         if self.paused:
             self.selected_option = 0
         
     def check_collisions(self):
-        # Check for player bullets hitting boss
-        if hasattr(self.player, 'bullets') and hasattr(self, 'boss') and self.boss in self.all_sprites:
-            for bullet in self.player.bullets:
-                if self.boss.rect.colliderect(bullet.rect):
-                    boss_defeated = self.boss.take_damage(bullet.damage if hasattr(bullet, 'damage') else 10)
-                    bullet.kill()
-                    if boss_defeated:
-                        self.boss_defeated = True
-                        self.start_transition()
+        # Refill the broadphase with this tick's targets
+        self.enemy_hash.clear()
+        self.player_hash.clear()
+        if hasattr(self, 'boss') and self.boss in self.all_sprites:
+            self.enemy_hash.insert(self.boss)
+        if hasattr(self, 'player'):
+            self.player_hash.insert(self.player)
+
+        # Check for player bullets hitting boss, each bullet hits one enemy
+        if hasattr(self.player, 'bullets'):
+            for bullet, enemy in self.enemy_hash.query_pairs(self.player.bullets):
+                if not bullet.alive():
+                    continue
+                enemy_defeated = enemy.take_damage(bullet.damage if hasattr(bullet, 'damage') else 10)
+                bullet.kill()
+                if enemy_defeated and enemy is self.boss:
+                    self.boss_defeated = True
+                    self.start_transition()
                         
         # Check for boss bullets hitting player
-        if hasattr(self.boss, 'bullets') and hasattr(self, 'player'):
-            for bullet in self.boss.bullets:
-                if self.player.rect.colliderect(bullet.rect):
-                    player_dead = self.player.take_damage(bullet.damage if hasattr(bullet, 'damage') else 10)
-                    bullet.kill()
-                    if player_dead:
-                        self.game_over = True
-                        self.start_transition()
+        if hasattr(self.boss, 'bullets'):
+            bullets = self.boss.bullets
+            half = bullets.size / 2
+            pos = bullets.pos[:bullets.count]
+            hits = {}
+            for index, player in self.player_hash.query_boxes(pos[:, 0], pos[:, 1], half, half):
+                hits.setdefault(index, player)
+            damages = bullets.damage[list(hits)].tolist()
+            bullets.kill(list(hits))
+            for player, damage in zip(hits.values(), damages):
+                player_dead = player.take_damage(damage)
+                if player_dead and player is self.player:
+                    self.game_over = True
+                    self.start_transition()
+
+    def update_camera(self, dt):
+        self.camera.update(self.player.rect, dt)
+
+        # Re-bin sprites that moved into other cells
+        self.sprite_index.update()
+
+    @property
+    def collision_stats(self):
+        # broadphase pairs tested vs true hits this tick
+        return {
+            'candidates': self.enemy_hash.candidates + self.player_hash.candidates,
+            'hits': self.enemy_hash.hits + self.player_hash.hits,
+        }
 
     def start_transition(self):
         self.transitioning = True
@@ -142,11 +214,12 @@ class Gameplay(BaseState):
     
     def update_transition(self, dt):
         if self.transitioning:
-            self.transition_alpha += self.transition_speed
+            self.transition_alpha += self.transition_speed * dt
             if self.transition_alpha >= 255:
                 self.transition_alpha = 255
                 self.done = True  # Move to next state when fully faded
-                pygame.mixer.music.pause()
+                self.controls.close()
+                audio.pause_music()
 
     def update(self, dt):
         # Don't update game if paused
@@ -158,19 +231,19 @@ class Gameplay(BaseState):
             self.update_transition(dt)
             return
         
-        # Update all sprites
-        self.all_sprites.update(dt)
-        self.boss.update(dt)
-        
-        # Update bullets from all entities
-        if hasattr(self.boss, 'bullets'):
-            self.boss.bullets.update(dt)
-            
-        # Check for collisions
-        self.check_collisions()
-        
-        # Update camera
-        self.camera.update(self.player.rect)
+        # Take this tick's input snapshot
+        self.controls.poll(self)
+
+        # Remember where everything was for render interpolation
+        self.camera.previous_offset = self.camera.offset.copy()
+        for sprite in self.all_sprites:
+            sprite.previous_center = sprite.rect.center
+
+        # Input, AI, movement, projectiles, collisions and camera, each entity once
+        self.scheduler.run(dt)
+        frame_profiler.count('sprites', len(self.all_sprites))
+        frame_profiler.count('boss_bullets', len(self.boss.bullets))
+        frame_profiler.count('player_bullets', len(self.player.bullets))
         
         # Check game over conditions
         if hasattr(self.player, 'health') and self.player.health <= 0:
@@ -187,27 +260,20 @@ class Gameplay(BaseState):
 
     def draw(self, surface):
         surface.fill((0, 0, 0))
-        
-        # Draw all sprites except boss and player
-        for sprite in self.all_sprites:
-            if sprite != self.boss and sprite != self.player:
-                surface.blit(sprite.image, self.camera.apply(sprite.rect))
-        
-        # Draw player
-        if hasattr(self, 'player'):
-            # Check if player has its own draw method
-            if hasattr(self.player, 'draw'):
-                self.player.draw(surface, self.camera)
-            else:
-                surface.blit(self.player.image, self.camera.apply(self.player.rect))
-        
-        # Draw boss with special effects
-        if hasattr(self, 'boss') and self.boss in self.all_sprites:
-            # Check if boss has its own draw method
-            if hasattr(self.boss, 'draw'):
-                self.boss.draw(surface, self.camera)
-            else:
-                surface.blit(self.boss.image, self.camera.apply(self.boss.rect))
+
+        # Blend positions between the last two steps, frozen while paused or fading out
+        alpha = 1.0 if self.paused or self.transitioning else self.interpolation
+        with self.camera.interpolated(alpha):
+            # Draw the pre-baked map chunks under the camera
+            self.tilemap.draw(surface, self.camera)
+
+            # Draw only the sprites the camera can see, ordered by layer:
+            # player bullets, player, boss
+            for sprite in self.camera.visible_sprites(self.sprite_index):
+                self.draw_sprite(surface, sprite, alpha)
+
+            # Boss bullets cull themselves and go on top
+            self.boss.bullets.draw(surface, self.camera, alpha)
         
         # Draw boss health UI at the top of the screen
         if hasattr(self, 'boss') and hasattr(self.boss, 'health') and self.boss in self.all_sprites:
@@ -227,9 +293,26 @@ class Gameplay(BaseState):
         # Draw custom cursor
         custom_cursor(surface)
 
+    def draw_sprite(self, surface, sprite, alpha):
+        # Move the sprite to its interpolated position just for drawing,
+        # topleft is restored exactly so drawing never changes the simulation
+        topleft = sprite.rect.topleft
+        center = sprite.rect.center
+        previous = getattr(sprite, 'previous_center', None)
+        if previous is not None:
+            sprite.rect.center = (previous[0] + (center[0] - previous[0]) * alpha,
+                                  previous[1] + (center[1] - previous[1]) * alpha)
+
+        # Sprites with special effects draw themselves
+        if hasattr(sprite, 'draw'):
+            sprite.draw(surface, self.camera)
+        else:
+            surface.blit(sprite.image, self.camera.apply(sprite.rect))
+        sprite.rect.topleft = topleft
+
     def draw_transition(self, surface):
-        transition_surface = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
-        transition_surface.fill((0, 0, 0, self.transition_alpha))
+        transition_surface = memory.track_surface(pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA), 'transition_overlay')
+        transition_surface.fill((0, 0, 0, int(self.transition_alpha)))
         surface.blit(transition_surface, (0, 0))
 
     def draw_health_ui(self, surface):
@@ -276,13 +359,13 @@ class Gameplay(BaseState):
     
     def draw_pause_menu(self, surface):
         # Semi-transparent background
-        overlay = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
+        overlay = memory.track_surface(pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA), 'pause_overlay')
         overlay.fill((0, 0, 0, 175))  # Black with alpha
         surface.blit(overlay, (0, 0))
         
         # Create font for pause menu
-        font = pygame.font.Font(self.font_path, 24)
-        title_font = pygame.font.Font(self.font_path, 32)
+        font = load_font(self.font_path, 24)
+        title_font = load_font(self.font_path, 32)
         
         # Draw pause title
         title = title_font.render("PAUSED", True, (255, 255, 255))
@@ -336,15 +419,18 @@ class Gameplay(BaseState):
     def execute_pause_option(self):
         option = self.pause_options[self.selected_option]
         if option == "Resume":
-            self.paused = False
+            self.toggle_pause()
         elif option == "Restart":
             self.persist["restart"] = True
             self.next_state = "GAMEPLAY"
+            self.controls.close()
             self.done = True
         elif option == "Menu":
             self.next_state = "MENU"
-            pygame.mixer.music.pause()
+            audio.pause_music()
+            self.controls.close()
             self.done = True
         elif option == "Quit":
+            self.controls.close()
             pygame.quit()
             sys.exit()
\ No newline at end of file
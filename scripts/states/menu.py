@@ -1,19 +1,15 @@
 import pygame
 from .base import BaseState
 from os.path import join
+from scripts.assets import assets
 
 class Menu(BaseState):
     def __init__(self):
         super().__init__()
-        self.background = pygame.image.load(self.background_path).convert_alpha()
+        self.background = assets.image(self.background_path)
         self.active_index = 0
         self.options = ["Start Game", "How To Play", "Quit Game"]
         
-        # Ambient
-        pygame.mixer.music.load('data/sound/music/ambient.wav')
-        pygame.mixer.music.set_volume(0.3)
-        pygame.mixer.music.play(-1)
-        
     def render_text(self, index):
         if index == self.active_index:
             color = (255, 255, 255)
@@ -1,5 +1,7 @@
 import pygame
 from .base import BaseState
+from scripts.preload import preloader
+from scripts.audio import audio
 
 
 class Splash(BaseState):
@@ -12,10 +14,17 @@ class Splash(BaseState):
         self.skip_text = self.font.render("Press Space to Skip", False, (200, 200, 200))
         self.skip_rect = self.skip_text.get_rect(center=(self.screen_rect.centerx, self.screen_rect.centery + 30))
 
+        # asset preloading progress
+        self.progress_rect = pygame.Rect(0, 0, 120, 3)
+        self.progress_rect.center = (self.screen_rect.centerx, self.screen_rect.centery + 50)
+
         self.next_state = "BACKSTORY"
         self.time_active = 0
         self.dot_timer = 0
         self.dot_count = 0
+
+        # Ambient, plays on through the backstory and menu
+        audio.play_music('data/sound/music/ambient.wav', volume=0.3)
         
     def get_event(self, event):
         if event.type == pygame.KEYDOWN:
@@ -42,4 +51,9 @@ class Splash(BaseState):
     def draw(self, surface):
         surface.fill((0,0,0))
         surface.blit(self.title, self.title_rect)
-        surface.blit(self.skip_text, self.skip_rect)
\ No newline at end of file
+        surface.blit(self.skip_text, self.skip_rect)
+
+        pygame.draw.rect(surface, (60, 60, 60), self.progress_rect)
+        filled = self.progress_rect.copy()
+        filled.width = round(self.progress_rect.width * preloader.progress)
+        pygame.draw.rect(surface, (255, 255, 255), filled)
\ No newline at end of file
@@ -0,0 +1,124 @@
+"""
+Bullet stress test.
+
+Loads the real arena with the player and the boss, then ramps bullet pressure
+level by level on top of the boss's own attacks: more bullet_hell rings per
+second, denser rings and longer bullet lifetimes. Each level runs frames of
+SIM_HZ / FPS simulation steps plus a draw, until the median frame work goes
+over the budget. The report is bullet count against update, collision and
+draw time: the ceiling of the bullet path on this machine.
+
+    python -m scripts.stress [--budget MS] [--level-seconds S] [-o report.csv]
+"""
+import argparse
+import csv
+import sys
+import time
+
+from scripts.headless import init_headless, make_gameplay
+from scripts.settings import FPS, SIM_HZ
+
+REPORT_COLUMNS = ('level', 'rings_per_second', 'ring_count', 'lifetime', 'bullets', 'peak_bullets',
+                  'update_ms', 'projectiles_ms', 'collision_ms', 'draw_ms', 'work_p50_ms', 'work_p99_ms')
+
+
+def pressure(level):
+    """
+    Extra bullet_hell settings at a level: (rings per second, bullets per ring, lifetime in seconds).
+    """
+    return 2 + 2 * level, 12 + 4 * level, 10 + 2 * level
+
+
+def run_stress(budget_ms=1000 / FPS, level_seconds=3, max_levels=40, seed=1, log=print):
+    init_headless()
+    import pygame
+    from scripts.inputs import ScriptedInput, InputFrame
+    from scripts.patterns import PATTERNS, PatternEmitter
+    from scripts.profiler import frame_profiler
+    from scripts.simclock import sim_clock
+
+    gameplay = make_gameplay(ScriptedInput(lambda tick, state: InputFrame()), seed)
+    # the player soaks up hits forever, bullets that reach it still die
+    gameplay.player.invincible = True
+    gameplay.player.invincibility_duration = float('inf')
+    boss = gameplay.boss
+    surface = pygame.display.get_surface()
+
+    step = sim_clock.step
+    steps_per_frame = max(1, round(SIM_HZ / FPS))
+    frames_per_level = int(level_seconds * FPS)
+    if frames_per_level > frame_profiler.size:
+        # the level's stats would only cover the frames still in the profiler's ring
+        raise ValueError(f'level_seconds is at most {frame_profiler.size / FPS:g}, got {level_seconds:g}')
+
+    rows = []
+    for level in range(max_levels):
+        rate, count, lifetime = pressure(level)
+        emitter = PatternEmitter({**PATTERNS['bullet_hell'], 'rate': rate, 'count': count, 'spin': 37})
+        boss.bullets.max_lifetime = lifetime
+        boss.bullets.peak = len(boss.bullets)
+
+        first_frame = frame_profiler.frames
+        live = 0
+        for _ in range(frames_per_level):
+            frame_profiler.begin_frame()
+            with frame_profiler.phase('update'):
+                for _ in range(steps_per_frame):
+                    sim_clock.advance(step)
+                    emitter.update(step, boss)
+                    gameplay.update(step)
+            with frame_profiler.phase('draw'):
+                gameplay.draw(surface)
+            frame_profiler.end_frame()
+            live += len(boss.bullets)
+
+        stats = frame_profiler.stats(frame_profiler.frames - first_frame)
+        row = (level, rate, count, lifetime, live // frames_per_level, boss.bullets.peak,
+               stats['update']['p50'], stats['projectiles']['p50'], stats['collision']['p50'],
+               stats['draw']['p50'], stats['work']['p50'], stats['work']['p99'])
+        rows.append(row)
+        log('  '.join(f'{value:>8.2f}' if isinstance(value, float) else f'{value:>8}' for value in row))
+        if stats['work']['p50'] > budget_ms:
+            break
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Ramp bullet pressure until frames go over budget.')
+    parser.add_argument('--budget', type=float, default=1000 / FPS, help='frame budget in ms')
+    parser.add_argument('--level-seconds', type=float, default=3, help='game time per pressure level')
+    parser.add_argument('--max-levels', type=int, default=40)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('-o', '--output', help='also write the report as CSV')
+    args = parser.parse_args()
+
+    from scripts.profiler import frame_profiler
+    if args.level_seconds * FPS > frame_profiler.size:
+        parser.error(f'--level-seconds is at most {frame_profiler.size / FPS:g}, '
+                     f'the frame profiler keeps {frame_profiler.size} frames')
+
+    print('  '.join(f'{column[:8]:>8}' for column in REPORT_COLUMNS))
+    start = time.perf_counter()
+    rows = run_stress(args.budget, args.level_seconds, args.max_levels, args.seed)
+
+    elapsed = time.perf_counter() - start
+    over = rows[-1][10] > args.budget
+    if over and len(rows) == 1:
+        print(f'no level fit the budget: level 0 already took {rows[0][10]:.2f} ms '
+              f'against {args.budget:.1f} ms ({elapsed:.1f}s)', file=sys.stderr)
+    else:
+        # the last level that stayed within the budget
+        ceiling = rows[-2][4] if over else rows[-1][4]
+        status = 'budget exceeded' if over else 'budget never exceeded'
+        print(f'{status} after {len(rows)} levels ({elapsed:.1f}s), '
+              f'ceiling ~{ceiling} live bullets at {args.budget:.1f} ms', file=sys.stderr)
+
+    if args.output:
+        with open(args.output, 'w', newline='') as file:
+            writer = csv.writer(file)
+            writer.writerow(REPORT_COLUMNS)
+            writer.writerows(rows)
+
+
+if __name__ == '__main__':
+    main()
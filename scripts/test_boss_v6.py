@@ -1,22 +1,26 @@
 import pygame
-from scripts.collision import Sprite, CollisionSprite
 from scripts.AssetLoader import AssetLoader
+from scripts.bullets import BulletManager
+from scripts.audio import audio
+from scripts.simclock import sim_clock
+from scripts.memory import memory
+from scripts.patterns import PATTERNS, ATTACK_PATTERNS, PatternEmitter
 from scripts.settings import *
-import math
-import random
 from os.path import join
 
 class Boss(pygame.sprite.Sprite):
-    def __init__(self, pos, groups, collision_sprites, player):
+    def __init__(self, pos, groups, collision_map, player, rng):
+        self.draw_layer = 2  # drawn above the player, set before joining groups
         super().__init__(groups)
         
         # Core attributes
         self.pos = pygame.math.Vector2(pos)
-        self.collision_sprites = collision_sprites
+        self.collision_map = collision_map
         self.player = player
+        self.rng = rng  # the run's seeded random stream
         
         # Animation setup
-        self.asset_loader = AssetLoader()
+        self.asset_loader = AssetLoader(self)
         self.animations = {
             'idle': self.asset_loader.load_animation('data', 'images', 'entities', 'enemy', 'boss_eye_idle'),
             'defensive': self.asset_loader.load_animation('data', 'images', 'entities', 'enemy', 'boss_eye_defensive'),
@@ -24,7 +28,7 @@ class Boss(pygame.sprite.Sprite):
             'attack_eye': self.asset_loader.load_animation('data', 'images', 'entities', 'enemy', 'boss_eye_attack_w_eye'),
             'attack_hands': self.asset_loader.load_animation('data', 'images', 'entities', 'enemy', 'boss_eye_attack_w_hands'),
         }
-        self.shoot_sound = pygame.mixer.Sound('data/sound/sfx/boss_bullet_1.wav')
+        audio.load('boss_shot', 'data/sound/sfx/boss_bullet_1.wav', volume=0.4, max_voices=3, priority=0)
         # Animation state
         self.state = 'idle'
         self.frame_index = 0
@@ -39,6 +43,7 @@ class Boss(pygame.sprite.Sprite):
         self.max_health = 5000
         self.health = self.max_health
         self.speed = 100  # Increased from 1.5 to 60 units per second
+        self.tempo = 2  # movement, attacks and animation run at twice game time
         self.attack_cooldown = 1000  # milliseconds - reduced cooldown
         self.last_attack_time = 0
         self.last_movement_time = 0
@@ -50,8 +55,9 @@ class Boss(pygame.sprite.Sprite):
         self.attack_during_chase = True  # Can attack while chasing
         
         # Attack patterns
-        self.bullets = pygame.sprite.Group()
-        self.attack_patterns = ['eye_barrage', 'hand_sweep', 'bullet_hell']
+        self.bullets = BulletManager(collision_map)
+        self.attack_patterns = ATTACK_PATTERNS
+        self.emitters = {name: PatternEmitter(pattern) for name, pattern in PATTERNS.items()}
         self.current_pattern = None
         self.pattern_timer = 0
         
@@ -90,7 +96,7 @@ class Boss(pygame.sprite.Sprite):
         margin = 100  # Stay away from edges
         
         # Decide whether to chase player
-        if random.random() < self.chase_chance:
+        if self.rng.random() < self.chase_chance:
             self.chase_player = True
             self.current_state = 'chasing'
             return
@@ -98,8 +104,8 @@ class Boss(pygame.sprite.Sprite):
             self.chase_player = False
         
         # Choose a random point within screen bounds but use the full arena
-        target_x = random.randint(margin, screen_width - margin)
-        target_y = random.randint(margin, screen_height - margin)
+        target_x = self.rng.randint(margin, screen_width - margin)
+        target_y = self.rng.randint(margin, screen_height - margin)
         self.target_pos = pygame.math.Vector2(target_x, target_y)
         
         # Calculate direction to target
@@ -109,7 +115,7 @@ class Boss(pygame.sprite.Sprite):
             self.moving = True
             
         # Set the last movement time
-        self.last_movement_time = pygame.time.get_ticks()
+        self.last_movement_time = sim_clock.get_ticks()
         
     def take_damage(self, damage):
         self.health -= damage
@@ -119,7 +125,7 @@ class Boss(pygame.sprite.Sprite):
         self.flash_timer = 0
         
         # Enter defensive state occasionally when hit, but with lower probability
-        if random.random() < 0.1 and self.current_state not in ['defensive', 'charging']:  # Reduced from 0.3 to 0.1
+        if self.rng.random() < 0.1 and self.current_state not in ['defensive', 'charging']:  # Reduced from 0.3 to 0.1
             self.current_state = 'defensive'
             self.state = 'defensive'
             self.frame_index = 0
@@ -139,19 +145,17 @@ class Boss(pygame.sprite.Sprite):
             self.state_timer = 0
             
             # Spawn a ring of bullets to signal phase change
-            for angle in range(0, 360, 15):
-                self.shoot_bullet(angle)
+            self.fire_pattern('phase_ring')
         
         if self.health <= 0:
             # Death effect - spawn bullets in all directions
-            for angle in range(0, 360, 10):
-                self.shoot_bullet(angle)
+            self.fire_pattern('death_burst')
             self.kill()
             return True  # Boss is defeated
         return False
     
     def idle_state(self, dt):
-        current_time = pygame.time.get_ticks()
+        current_time = sim_clock.get_ticks()
         
         # Check if it's time to move again
         if not self.moving or current_time - self.last_movement_time > self.movement_cooldown:
@@ -202,7 +206,7 @@ class Boss(pygame.sprite.Sprite):
         self.hitbox.center = self.rect.center
         
         # Check if we should attack while chasing
-        current_time = pygame.time.get_ticks()
+        current_time = sim_clock.get_ticks()
         if self.attack_during_chase and current_time - self.last_attack_time > self.attack_cooldown:
             self.current_state = 'charging'
             self.state = 'chargeup'
@@ -210,7 +214,7 @@ class Boss(pygame.sprite.Sprite):
             self.state_timer = 0
             
         # Randomly decide to stop chasing
-        if random.random() < 0.01:  # 1% chance per frame to stop chasing
+        if self.rng.random() < 1 - 0.99 ** (dt * 60):  # 1% chance per 60 FPS frame to stop chasing
             self.chase_player = False
             self.current_state = 'idle'
     
@@ -231,7 +235,8 @@ class Boss(pygame.sprite.Sprite):
             self.current_state = 'attacking'
             
             # Choose an attack pattern
-            self.current_pattern = random.choice(self.attack_patterns)
+            self.current_pattern = self.rng.choice(self.attack_patterns)
+            self.emitters[self.current_pattern].reset()
             
             # Set appropriate animation based on attack pattern
             if self.current_pattern == 'eye_barrage':
@@ -241,25 +246,20 @@ class Boss(pygame.sprite.Sprite):
                 
             self.frame_index = 0
             self.state_timer = 0
-            self.last_attack_time = pygame.time.get_ticks()
+            self.last_attack_time = sim_clock.get_ticks()
             self.consecutive_attacks += 1  # Track consecutive attacks
     
     def attacking_state(self, dt):
         self.state_timer += dt
         
-        # Execute different attack patterns
-        if self.current_pattern == 'eye_barrage':
-            self.eye_barrage_attack(dt)
-        elif self.current_pattern == 'hand_sweep':
-            self.hand_sweep_attack(dt)
-        elif self.current_pattern == 'bullet_hell':
-            self.bullet_hell_attack(dt)
+        # Run the selected pattern's emitter
+        self.emitters[self.current_pattern].update(dt, self)
         
         # After attack duration, go back to idle
         attack_duration = 1.5  # Reduced from 3.0 to 1.5 seconds
         if self.state_timer >= attack_duration:
             # After attack, decide whether to keep attacking or move
-            if random.random() < 0.7:  # 70% chance to continue attacking
+            if self.rng.random() < 0.7:  # 70% chance to continue attacking
                 self.current_state = 'idle'  # Will quickly transition to charging again
             else:
                 # Force movement after attack sequence
@@ -270,71 +270,13 @@ class Boss(pygame.sprite.Sprite):
             self.state = 'idle'
             self.state_timer = 0
     
-    def eye_barrage_attack(self, dt):
-        # Always shoot directly at player position for more accurate tracking
-        if random.random() < 0.25:  # Increased from 0.2 to 0.25
-            self.shoot_at_player()
-    
-    def hand_sweep_attack(self, dt):
-        # Sweep bullets in an arc, always centered on player
-        if random.random() < 0.15:  # Increased from 0.1 to 0.15
-            angle_spread = 60  # degrees
-            
-            # Continuously update center angle to track player movement
-            center_angle = math.degrees(math.atan2(
-                self.player.rect.centery - self.rect.centery,
-                self.player.rect.centerx - self.rect.centerx
-            ))
-            
-            for i in range(-2, 3):
-                angle = center_angle + (i * angle_spread / 4)
-                self.shoot_bullet(angle)
-    
-    def bullet_hell_attack(self, dt):
-        # Spray bullets in all directions
-        if random.random() < 0.12:  # Increased from 0.1 to 0.12
-            for angle in range(0, 360, 30):
-                offset_angle = angle + random.uniform(-5, 5)  # Add slight randomness
-                self.shoot_bullet(offset_angle)
-    
-    def shoot_at_player(self):
-        # Calculate angle to player's current position
-        dx = self.player.rect.centerx - self.rect.centerx
-        dy = self.player.rect.centery - self.rect.centery
-        angle = math.degrees(math.atan2(dy, dx))
-        
-        # Add slight randomness for difficulty control
-        angle += random.uniform(-3, 3)  # Reduced spread from -5,5 to -3,3 for more accuracy
-        self.shoot_bullet(angle)
-        
-        # In phase 2, shoot an additional bullet with prediction
-        if self.phase >= 2 and random.random() < 0.4:
-            # Try to predict where player will be
-            player_velocity = getattr(self.player, 'direction', pygame.math.Vector2(0, 0))
-            if player_velocity.length() > 0:
-                prediction_factor = 30  # How far ahead to predict
-                predicted_pos = pygame.math.Vector2(
-                    self.player.rect.centerx + player_velocity.x * prediction_factor,
-                    self.player.rect.centery + player_velocity.y * prediction_factor
-                )
-                
-                # Calculate angle to predicted position
-                pred_dx = predicted_pos.x - self.rect.centerx
-                pred_dy = predicted_pos.y - self.rect.centery
-                pred_angle = math.degrees(math.atan2(pred_dy, pred_dx))
-                
-                self.shoot_bullet(pred_angle)
-    
-    def shoot_bullet(self, angle):
-        self.shoot_sound.set_volume(0.4)
-        self.shoot_sound.play()
-        Bullet(
-            self.rect.center, 
-            angle, 
-            self.bullets, 
-            self.collision_sprites,
-            self.phase
-        )
+    def fire_pattern(self, name):
+        # Fire a single volley of a pattern right away
+        self.emitters[name].fire(self)
+
+    def spawn_volley(self, directions):
+        audio.play('boss_shot', len(directions))
+        self.bullets.spawn_directions(self.rect.center, directions, self.phase)
     
     def animate(self, dt):
         self.frame_index += self.animation_speed * dt * 60
@@ -356,114 +298,21 @@ class Boss(pygame.sprite.Sprite):
                 self.flash_timer = 0
     
     def update(self, dt):
+        # The fight was tuned with the boss ticking twice per step
+        dt *= self.tempo
+
         # Execute current state behavior
         self.states[self.current_state](dt)
         
         # Update animation
         self.animate(dt)
-        
-        # Update bullets
-        self.bullets.update(dt)
     
     def draw(self, surface, camera):
         # Draw boss with flash effect if getting hit
         if self.flashing and int(self.flash_timer * 15) % 2 == 0:
             # Create a white version of the current frame for the flash effect
-            white_image = self.image.copy()
+            white_image = memory.track_surface(self.image.copy(), 'hit_flash')
             white_image.fill((255, 255, 255), special_flags=pygame.BLEND_RGB_ADD)
             surface.blit(white_image, camera.apply(self.rect))
         else:
             surface.blit(self.image, camera.apply(self.rect))
-            
-        # Draw bullets with trail effects
-        for bullet in self.bullets:
-            bullet.draw(surface, camera)        
-
-
-class Bullet(pygame.sprite.Sprite):
-    def __init__(self, pos, angle, groups, collision_sprites, phase=1):
-        super().__init__(groups)
-        
-        # Store collision sprites
-        self.collision_sprites = collision_sprites
-        
-        # Create bullet image with trail effect - size adjusted for better matching
-        bullet_size = 8  # Reduced from 12 to 8 for better size ratio with player
-        self.image = pygame.Surface((bullet_size, bullet_size), pygame.SRCALPHA)
-        
-        # Different bullet colors based on phase
-        if phase == 1:
-            self.color = (255, 0, 0)  # Red bullets for phase 1
-            self.trail_color = (255, 100, 0)  # Orange trail
-        else:
-            self.color = (255, 0, 255)  # Purple bullets for phase 2
-            self.trail_color = (200, 0, 255)  # Light purple trail
-            
-        # Draw the bullet with a glow effect
-        center_point = bullet_size // 2
-        glow_radius = bullet_size // 2  # Full radius for glow
-        core_radius = bullet_size // 3  # Core is 2/3 the size of the glow
-        
-        pygame.draw.circle(self.image, self.trail_color, (center_point, center_point), glow_radius)  # Outer glow
-        pygame.draw.circle(self.image, self.color, (center_point, center_point), core_radius)  # Core
-        
-        # Position and movement
-        self.rect = self.image.get_frect(center=pos)
-        # Create a smaller hitbox to match visible bullet core
-        self.hitbox = self.rect.inflate(-2, -2)
-        self.pos = pygame.math.Vector2(pos)
-        self.spawn_time = pygame.time.get_ticks()
-        
-        # Convert angle to radians for direction calculation
-        angle_rad = math.radians(angle)
-        self.direction = pygame.math.Vector2(math.cos(angle_rad), math.sin(angle_rad))
-        
-        # Bullet attributes
-        self.speed = 60 * (1 + 0.5 * (phase - 1)) 
-        self.damage = 10 * phase  # More damage in later phases
-        self.lifetime = 0
-        self.max_lifetime = 10  # Seconds
-        
-        # Trail effect
-        self.trail_positions = []
-        self.max_trail_length = 5
-    
-    def update(self, dt):
-        # Store previous position for trail
-        if len(self.trail_positions) >= self.max_trail_length:
-            self.trail_positions.pop(0)
-        self.trail_positions.append(self.pos.copy())
-        
-        # Move bullet
-        movement = self.direction * self.speed * dt
-        self.pos += movement
-        self.rect.center = self.pos
-        self.hitbox.center = self.pos  # Update hitbox position as well
-        
-        # Check for collisions with walls using hitbox instead of rect
-        for sprite in self.collision_sprites:
-            if sprite.rect.colliderect(self.hitbox):
-                self.kill()
-                break
-        
-        # Update lifetime and kill if exceeded
-        self.lifetime += dt
-        if self.lifetime >= self.max_lifetime:
-            self.kill()
-    
-    def draw(self, surface, camera):
-        # Draw trail
-        for i, pos in enumerate(self.trail_positions):
-            # Calculate alpha for fading trail
-            alpha = int(255 * (i / len(self.trail_positions)) * 0.5)
-            # Calculate size for shrinking trail
-            size = int(4 * (i / len(self.trail_positions)))
-            
-            # Create trail surface
-            trail_surf = pygame.Surface((size*2, size*2), pygame.SRCALPHA)
-            trail_color_with_alpha = (*self.trail_color, alpha)
-            pygame.draw.circle(trail_surf, trail_color_with_alpha, (size, size), size)
-            
-            # Draw trail
-            trail_rect = trail_surf.get_frect(center=pos)
-            surface.blit(trail_surf, camera.apply(trail_rect))
\ No newline at end of file
@@ -1,19 +1,29 @@
-from pytmx.util_pygame import load_pygame
 import pygame
-from scripts.settings import TILE_SIZE
-from scripts.collision import CollisionSprite
-from scripts.collision import Sprite
+from math import floor
+from scripts.settings import CHUNK_SIZE
+from scripts.collision import OccupancyGrid
+from scripts.mapbundle import load_bundle
+from scripts.memory import memory
 
 class TileMap:
-    def __init__(self, filename, all_sprites, collision_sprites, water_sprites):
-        self.tmx_data = load_pygame(filename)
-        self.all_sprites = all_sprites
-        self.collision_sprites = collision_sprites
-        self.water_sprites = water_sprites
-
-        self.load_collision_layer('Collisions')
-        self.load_water_layer('Water')
-        self.load_sprite_layers([
+    def __init__(self, filename):
+        # compiled map data, only parsed with pytmx when the .tmx changed
+        self.bundle = load_bundle(filename)
+
+        # map size in pixels
+        self.tilewidth = self.bundle.tilewidth
+        self.tileheight = self.bundle.tileheight
+        self.width = self.bundle.width * self.tilewidth
+        self.height = self.bundle.height * self.tileheight
+
+        # pre-rendered static layers, keyed by (chunk_x, chunk_y)
+        self.chunks = {}
+
+        self.load_tiles()
+        # walls and water rasterised for cell-local queries
+        self.collision_map = OccupancyGrid(self.bundle.object_rects('Collisions').tolist())
+        self.water_map = OccupancyGrid(self.bundle.object_rects('Water').tolist())
+        self.bake_layers([
             'Lowest',
             'Below',
             'Ground',
@@ -23,22 +33,56 @@ class TileMap:
         ])
 
     def get_entity_pos(self, entity_name):
-        for obj in self.tmx_data.get_layer_by_name('Entities'):
-            if obj.name == entity_name:
-                return pygame.Vector2(obj.x, obj.y)
+        for name, x, y in self.bundle.entities:
+            if name == entity_name:
+                return pygame.Vector2(x, y)
             return pygame.Vector2(0, 0)
 
-    def load_collision_layer(self, layer_name):
-        for obj in self.tmx_data.get_layer_by_name(layer_name):
-            surf = pygame.Surface((obj.width, obj.height))
-            CollisionSprite((obj.x, obj.y), surf, self.collision_sprites)
+    def load_tiles(self):
+        # one atlas surface, every tile is a subsurface of it
+        atlas = self.bundle.atlas
+        size = (atlas.shape[1], atlas.shape[0])
+        self.atlas = memory.track_surface(pygame.image.frombytes(atlas.tobytes(), size, 'RGBA').convert_alpha(), 'tile_atlas')
+        self.tiles = [self.atlas.subsurface(self.bundle.atlas_rect(slot)) for slot in range(self.bundle.tile_count)]
 
-    def load_water_layer(self, layer_name):
-        for obj in self.tmx_data.get_layer_by_name(layer_name):
-            surf = pygame.Surface((obj.width, obj.height))
-            CollisionSprite((obj.x, obj.y), surf, self.water_sprites)
+    def get_chunk(self, chunk_x, chunk_y):
+        chunk = self.chunks.get((chunk_x, chunk_y))
+        if chunk is None:
+            # edge chunks are clipped to the map size
+            width = min(CHUNK_SIZE, self.width - chunk_x * CHUNK_SIZE)
+            height = min(CHUNK_SIZE, self.height - chunk_y * CHUNK_SIZE)
+            chunk = memory.track_surface(pygame.Surface((width, height), pygame.SRCALPHA).convert_alpha(), 'map_chunk')
+            self.chunks[(chunk_x, chunk_y)] = chunk
+        return chunk
 
-    def load_sprite_layers(self, layer_names):
+    def bake_layers(self, layer_names):
+        """
+        Render the static tile layers into CHUNK_SIZE surfaces once, in layer order.
+        """
         for layer_name in layer_names:
-            for x, y, image in self.tmx_data.get_layer_by_name(layer_name).tiles():
-                Sprite((x * TILE_SIZE, y * TILE_SIZE), image, self.all_sprites)
\ No newline at end of file
+            layer = self.bundle.layer(layer_name)
+            for y, x in zip(*layer.nonzero()):
+                pos_x, pos_y = int(x) * self.tilewidth, int(y) * self.tileheight
+                chunk_x, chunk_y = pos_x // CHUNK_SIZE, pos_y // CHUNK_SIZE
+                chunk = self.get_chunk(chunk_x, chunk_y)
+                chunk.blit(self.tiles[layer[y, x] - 1], (pos_x - chunk_x * CHUNK_SIZE, pos_y - chunk_y * CHUNK_SIZE))
+
+    def draw(self, surface, camera):
+        """
+        Blit only the chunks that overlap the camera view.
+        """
+        offset_x, offset_y = camera.offset
+        first_x = max(0, int(offset_x // CHUNK_SIZE))
+        first_y = max(0, int(offset_y // CHUNK_SIZE))
+        last_x = int((offset_x + camera.width) // CHUNK_SIZE)
+        last_y = int((offset_y + camera.height) // CHUNK_SIZE)
+
+        blit_sequence = []
+        for chunk_y in range(first_y, last_y + 1):
+            for chunk_x in range(first_x, last_x + 1):
+                chunk = self.chunks.get((chunk_x, chunk_y))
+                if chunk is not None:
+                    # floor instead of truncating so chunks left of the view line up with on-screen sprites
+                    pos = (floor(chunk_x * CHUNK_SIZE - offset_x), floor(chunk_y * CHUNK_SIZE - offset_y))
+                    blit_sequence.append((chunk, pos))
+        surface.fblits(blit_sequence)